@@ -1,13 +1,19 @@
 import pytest
 import sys
 import os
+import itertools
 from unittest.mock import MagicMock
 
-# Add parent directory to path so vm_connection can be imported
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add parent directory to path so vm_connection can be imported; the test
+# modules rely on this instead of patching sys.path themselves
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
 
-from vm_connection import SSHConnection
+from vm_connection import SSHConnection, VMConnection, _load_pkey, _ping_is_windows
 
+# Function scoped on purpose: tests connect, close and record boot IDs on these,
+# and a fresh instance is far cheaper than untangling shared state between tests
 @pytest.fixture
 def ssh_connection():
     return SSHConnection(
@@ -17,14 +23,42 @@ def ssh_connection():
         port=22
     )
 
+@pytest.fixture
+def vm_connection():
+    return VMConnection(
+        host="test.example.com",
+        user="testuser",
+        key_path="/path/to/key",
+        port=22
+    )
+
+@pytest.fixture
+def paramiko_mocks():
+    """(client, stdout, stderr) mocks shaped like paramiko's, with exec_command returning the two files"""
+    client, stdout, stderr = MagicMock(), MagicMock(), MagicMock()
+    client.exec_command.return_value = (None, stdout, stderr)
+    return client, stdout, stderr
+
 @pytest.fixture
 def mock_stdout():
     def _create_mock(lines, exit_code=0):
+        """stdout file whose channel delivers one line per select() wakeup"""
         mock = MagicMock()
-        mock.channel.exit_status_ready.side_effect = [False] * len(lines) + [True]
-        mock.readline.side_effect = lines + ['']
-        mock.readlines.return_value = []
+        mock.channel.exit_status_ready.side_effect = itertools.chain(
+            itertools.repeat(False, len(lines)), itertools.repeat(True))
+        mock.channel.recv_ready.side_effect = itertools.chain(
+            itertools.chain.from_iterable(itertools.repeat((True, False), len(lines))), itertools.repeat(False))
+        mock.channel.recv.side_effect = (line.encode() for line in lines)
+        mock.channel.recv_stderr_ready.return_value = False
         mock.channel.recv_exit_status.return_value = exit_code
         mock.channel.setblocking.return_value = None
         return mock
     return _create_mock
+
+@pytest.fixture(autouse=True)
+def reset_connection_caches():
+    """Keep pooled (mock) transports, parsed keys and the cached platform from leaking between tests"""
+    yield
+    SSHConnection.shutdown_pool()
+    _load_pkey.cache_clear()
+    _ping_is_windows.cache_clear()
@@ -1,8 +1,10 @@
 import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import socket
+import subprocess
+import paramiko
+from unittest.mock import patch, MagicMock
 from vm_connection import SSHConnection
-import pytest
 
 def test_ssh_connection_initialization_with_valid_parameters():
     conn = SSHConnection("example.com", "testuser", "/path/to/key", 2222)
@@ -11,7 +13,78 @@ def test_ssh_connection_initialization_with_valid_parameters():
     assert conn.key_path == "/path/to/key"
     assert conn.port == 2222
 
-def test_ssh_connection_connect_validates_key_path(ssh_connection):
-    ssh_connection.key_path = None
-    with pytest.raises(ValueError, match="Key_path is required"):
-        ssh_connection.connect()
+@patch("paramiko.SSHClient")
+def test_key_path_is_expanded_once_at_init(mock_sshclient):
+    conn = SSHConnection("example.com", "testuser", "~/.ssh/id_rsa")
+    assert conn.key_path == os.path.expanduser("~/.ssh/id_rsa")
+
+    with patch("os.path.expanduser") as mock_expanduser:
+        conn.connect()
+        conn.close()
+
+    mock_expanduser.assert_not_called()
+    assert mock_sshclient.return_value.connect.call_args.kwargs['key_filename'] == conn.key_path
+
+@patch("paramiko.SSHClient")
+def test_connect_tunes_transport_socket(mock_sshclient, ssh_connection):
+    mock_client = MagicMock()
+    mock_sshclient.return_value = mock_client
+    transport = mock_client.get_transport.return_value
+
+    ssh_connection.connect()
+
+    transport.sock.setsockopt.assert_any_call(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    transport.sock.setsockopt.assert_any_call(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    transport.set_keepalive.assert_called_once_with(SSHConnection.KEEPALIVE_INTERVAL)
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        transport.sock.setsockopt.assert_any_call(
+            socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, SSHConnection.TCP_KEEPALIVE_IDLE)
+
+@patch("paramiko.SSHClient")
+def test_connect_tolerates_socket_options_failing(mock_sshclient, ssh_connection):
+    mock_client = MagicMock()
+    mock_sshclient.return_value = mock_client
+    transport = mock_client.get_transport.return_value
+    transport.sock.setsockopt.side_effect = OSError("Operation not supported")
+
+    ssh_connection.connect()
+
+    assert ssh_connection.client is mock_client
+    transport.set_keepalive.assert_called_once_with(SSHConnection.KEEPALIVE_INTERVAL)
+
+@patch("paramiko.RSAKey.from_private_key_file")
+@patch("paramiko.ECDSAKey.from_private_key_file", side_effect=paramiko.SSHException("not ECDSA"))
+@patch("paramiko.Ed25519Key.from_private_key_file", side_effect=paramiko.SSHException("not Ed25519"))
+@patch("paramiko.SSHClient")
+def test_connect_parses_key_file_once(mock_sshclient, mock_ed25519, mock_ecdsa, mock_rsa, tmp_path):
+    key_file = tmp_path / "id_rsa"
+    key_file.write_text("key")
+    mock_client = MagicMock()
+    mock_sshclient.return_value = mock_client
+    conn = SSHConnection("example.com", "testuser", str(key_file))
+
+    conn.connect()
+    conn.reconnect(retries=1)
+
+    mock_rsa.assert_called_once_with(str(key_file))
+    assert mock_client.connect.call_count == 2
+    assert mock_client.connect.call_args.kwargs['pkey'] is mock_rsa.return_value
+    assert mock_client.connect.call_args.kwargs['key_filename'] is None
+
+@patch("paramiko.SSHClient")
+def test_connect_falls_back_to_key_filename_when_key_unreadable(mock_sshclient, ssh_connection):
+    mock_client = MagicMock()
+    mock_sshclient.return_value = mock_client
+
+    ssh_connection.connect()
+
+    assert mock_client.connect.call_args.kwargs['pkey'] is None
+    assert mock_client.connect.call_args.kwargs['key_filename'] == "/path/to/key"
+
+def test_import_does_not_load_paramiko():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = subprocess.run(
+        [sys.executable, "-c", "import sys, vm_connection; print('paramiko' in sys.modules)"],
+        capture_output=True, text=True, cwd=root
+    )
+    assert probe.stdout.strip() == "False"
@@ -1,9 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
-import sys
-import os
 import paramiko
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from vm_connection import (
     SSHConnection, VMConnection, VMConnectionError, CommandTimeoutError, 
     VMRebootDetectedError, AuthenticationError
@@ -12,14 +9,6 @@ from vm_connection import (
 class TestErrorScenarios:
     """Test suite for various error scenarios and edge cases"""
     
-    @pytest.fixture
-    def ssh_connection(self):
-        return SSHConnection(
-            host="test.example.com",
-            user="testuser", 
-            key_path="/path/to/key"
-        )
-    
     def test_execute_without_connection_raises_error(self, ssh_connection):
         """Test that execute raises error when not connected"""
         with pytest.raises(VMConnectionError, match="Not connected to VM"):
@@ -69,31 +58,22 @@ class TestErrorScenarios:
         with pytest.raises(ValueError, match="Key_path is required"):
             ssh_connection.connect()
     
+    @patch("selectors.DefaultSelector")
     @patch("paramiko.SSHClient")
-    def test_execute_command_timeout_closes_channel(self, mock_sshclient, ssh_connection):
+    def test_execute_command_timeout_closes_channel(self, mock_sshclient, mock_selector, ssh_connection, paramiko_mocks):
         """Test that execute properly closes channel on timeout"""
-        mock_client = MagicMock()
+        mock_client, stdout_mock, _ = paramiko_mocks
         mock_sshclient.return_value = mock_client
-        
-        stdout_mock = MagicMock()
         stdout_mock.channel.exit_status_ready.return_value = False
-        stderr_mock = MagicMock()
-        
-        mock_client.exec_command.return_value = (None, stdout_mock, stderr_mock)
         
         ssh_connection.connect()
         
-        with patch("time.time", side_effect=[0, 2]):  # Simulate timeout
+        with patch("time.monotonic", side_effect=[0, 2]):  # Simulate timeout
             with pytest.raises(CommandTimeoutError):
                 ssh_connection.execute("long_command", timeout=1)
         
         stdout_mock.channel.close.assert_called_once()
-    
-    def test_reconnect_all_attempts_fail(self, ssh_connection):
-        """Test reconnect when all retry attempts fail"""
-        with patch.object(ssh_connection, 'connect', side_effect=VMConnectionError("Failed")):
-            result = ssh_connection.reconnect(retries=3, delay=0.1)
-            assert result is False
+        mock_selector.return_value.close.assert_called_once()
     
     def test_record_boot_id_without_connection(self, ssh_connection):
         """Test record_boot_id raises error when not connected"""
@@ -115,10 +95,11 @@ class TestErrorScenarios:
     def test_get_boot_id_failure(self, ssh_connection):
         """Test _get_boot_id when command fails"""
         ssh_connection.client = MagicMock()
+        ssh_connection.client.get_transport.return_value.open_session.side_effect = OSError("channel refused")
         
         # Mock exec_command to return empty stdout and error in stderr
         stdout_mock = MagicMock()
-        stdout_mock.read.return_value = b""
+        stdout_mock.channel.recv.return_value = b""
         stderr_mock = MagicMock()
         stderr_mock.read.return_value = b"Permission denied"
         
@@ -142,37 +123,21 @@ class TestErrorScenarios:
 class TestVMConnectionErrors:
     """Test error scenarios specific to VMConnection wrapper"""
     
-    @pytest.fixture
-    def vm_connection(self):
-        return VMConnection(
-            host="test.example.com",
-            user="testuser",
-            key_path="/path/to/key"
-        )
-    
     def test_vm_connection_delegates_errors(self, vm_connection):
         """Test that VMConnection properly delegates errors from SSH layer"""
-        with patch.object(vm_connection.ssh, 'connect', side_effect=AuthenticationError("Auth failed")):
+        with patch.object(SSHConnection, 'connect', side_effect=AuthenticationError("Auth failed")):
             with pytest.raises(AuthenticationError):
                 vm_connection.connect()
     
     def test_vm_connection_execute_error_delegation(self, vm_connection):
         """Test that VMConnection execute errors are properly delegated"""
-        with patch.object(vm_connection.ssh, 'execute', side_effect=CommandTimeoutError("cmd", 30)):
+        with patch.object(SSHConnection, 'execute', side_effect=CommandTimeoutError("cmd", 30)):
             with pytest.raises(CommandTimeoutError):
                 vm_connection.execute("test command", timeout=30)
 
 class TestEdgeCases:
     """Test various edge cases and boundary conditions"""
     
-    @pytest.fixture
-    def ssh_connection(self):
-        return SSHConnection(
-            host="test.example.com",
-            user="testuser",
-            key_path="/path/to/key"
-        )
-    
     def test_initialization_with_custom_port_and_timeout(self):
         """Test initialization with custom port and connection timeout"""
         conn = SSHConnection(
@@ -189,21 +154,18 @@ class TestEdgeCases:
         assert conn.port == 2222
         assert conn.connection_timeout == 30
     
+    @patch("selectors.DefaultSelector")
     @patch("paramiko.SSHClient")
-    def test_execute_with_no_output_callback(self, mock_sshclient, ssh_connection):
+    def test_execute_with_no_output_callback(self, mock_sshclient, mock_selector, ssh_connection, paramiko_mocks):
         """Test execute works correctly when no output callback is provided"""
-        mock_client = MagicMock()
+        mock_client, stdout_mock, _ = paramiko_mocks
         mock_sshclient.return_value = mock_client
         
-        stdout_mock = MagicMock()
         stdout_mock.channel.exit_status_ready.return_value = True
         stdout_mock.channel.recv_exit_status.return_value = 0
-        stdout_mock.readlines.return_value = ["output line 1\n", "output line 2\n"]
-        
-        stderr_mock = MagicMock()
-        stderr_mock.readlines.return_value = []
-        
-        mock_client.exec_command.return_value = (None, stdout_mock, stderr_mock)
+        stdout_mock.channel.recv_ready.side_effect = [True, False, False, False]
+        stdout_mock.channel.recv.return_value = b"output line 1\noutput line 2\n"
+        stdout_mock.channel.recv_stderr_ready.return_value = False
         
         ssh_connection.connect()
         exit_code = ssh_connection.execute("test command")  # No callback
@@ -224,7 +186,7 @@ class TestEdgeCases:
     @patch("time.sleep")
     def test_reconnect_with_zero_retries(self, mock_sleep, ssh_connection):
         """Test reconnect behavior with zero retries"""
-        with patch.object(ssh_connection, 'connect', side_effect=VMConnectionError("Failed")):
+        with patch.object(SSHConnection, 'connect', side_effect=VMConnectionError("Failed")):
             result = ssh_connection.reconnect(retries=0)
             assert result is False
             mock_sleep.assert_not_called()
@@ -1,69 +1,165 @@
 import pytest
-from unittest.mock import patch, MagicMock
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from vm_connection import CommandTimeoutError
-
-@patch("paramiko.SSHClient")
-def test_execute_command_returns_correct_exit_code(mock_sshclient, ssh_connection):
-    mock_client = MagicMock()
-    mock_sshclient.return_value = mock_client
-    stdout = MagicMock()
-    stdout.channel.exit_status_ready.return_value = True
-    stdout.channel.recv_exit_status.return_value = 0
-    stdout.readlines.return_value = []
-    stderr = MagicMock()
-    stderr.readlines.return_value = []
-    mock_client.exec_command.return_value = (None, stdout, stderr)
+import paramiko
+from unittest.mock import patch, MagicMock, call
+from vm_connection import SSHConnection, CommandTimeoutError
+
+@pytest.fixture
+def mock_paramiko_client(paramiko_mocks):
+    """Patch paramiko.SSHClient to hand out the shared (client, stdout, stderr) mocks"""
+    with patch("paramiko.SSHClient") as mock_sshclient:
+        mock_sshclient.return_value = paramiko_mocks[0]
+        yield paramiko_mocks
 
+@pytest.mark.parametrize('lines,exit_code', [([], 0), (["error output\n"], 1)])
+@patch("selectors.DefaultSelector")
+def test_execute_command_returns_exit_code(mock_selector, lines, exit_code, ssh_connection, mock_paramiko_client, mock_stdout):
+    """Test that execute runs the command through exec_command and returns its exit code"""
+    mock_client, _, stderr_mock = mock_paramiko_client
+    stdout_mock = mock_stdout(lines, exit_code=exit_code)
+    mock_client.exec_command.return_value = (None, stdout_mock, stderr_mock)
     ssh_connection.connect()
-    exit_code = ssh_connection.execute("echo test")
 
-    assert exit_code == 0
-    mock_client.exec_command.assert_called_once_with("echo test")
+    assert ssh_connection.execute("test command") == exit_code
+    mock_client.exec_command.assert_called_once_with("test command")
 
-@patch("select.select")
-@patch("paramiko.SSHClient")
-def test_execute_command_with_timeout_raises_timeout_error(mock_sshclient, mock_select, ssh_connection):
-    mock_client = MagicMock()
-    mock_sshclient.return_value = mock_client
-    stdout = MagicMock()
+@patch("selectors.DefaultSelector")
+def test_execute_command_with_timeout_raises_timeout_error(mock_selector, ssh_connection, mock_paramiko_client):
+    _, stdout, _ = mock_paramiko_client
     stdout.channel.exit_status_ready.return_value = False
-    stderr = MagicMock()
-    mock_client.exec_command.return_value = (None, stdout, stderr)
-    mock_select.return_value = ([], [], [])
+    stdout.channel.recv_ready.return_value = False
+    stdout.channel.recv_stderr_ready.return_value = False
     ssh_connection.connect()
     with pytest.raises(CommandTimeoutError):
         ssh_connection.execute("long_running_command", timeout=1)
 
-@patch("select.select")
-@patch("paramiko.SSHClient")
-def test_execute_command_handles_non_zero_exit_code(mock_sshclient, mock_select, ssh_connection, mock_stdout):
-    """Test that execute method properly handles commands with non-zero exit codes"""
-    mock_client_instance = MagicMock()
-    mock_sshclient.return_value = mock_client_instance
-    stdout_mock = mock_stdout(["error output\n"], exit_code=1)
-    stderr_mock = mock_stdout(["stderr message\n"])
-    mock_client_instance.exec_command.return_value = (None, stdout_mock, stderr_mock)
-    mock_select.side_effect = [([stdout_mock.channel], [], []), ([], [], [])]
+@patch("selectors.DefaultSelector")
+def test_execute_with_capture_output_returns_stdout_and_stderr(mock_selector, ssh_connection, mock_paramiko_client):
+    """Test that capture_output returns the full decoded stdout and stderr alongside the exit code"""
+    _, stdout, _ = mock_paramiko_client
+    stdout.channel.exit_status_ready.return_value = True
+    stdout.channel.recv_exit_status.return_value = 2
+    stdout.channel.recv_ready.side_effect = [True, True, False, False, False]
+    stdout.channel.recv.side_effect = [b"partial ", b"output\n"]
+    stdout.channel.recv_stderr_ready.side_effect = [True, False, False, False]
+    stdout.channel.recv_stderr.return_value = b"oops\n"
+
     ssh_connection.connect()
-    exit_code = ssh_connection.execute("failing_command")
-    assert exit_code == 1
-
-@patch("paramiko.SSHClient")
-def test_execute_command_calls_exec_command(mock_sshclient, ssh_connection):
-    """Test that execute method calls paramiko exec_command with correct parameters"""
-    mock_client_instance = MagicMock()
-    mock_sshclient.return_value = mock_client_instance
-    
-    stdout_mock = MagicMock()
-    stdout_mock.channel.exit_status_ready.return_value = True
-    stdout_mock.channel.recv_exit_status.return_value = 0
-    stdout_mock.readlines.return_value = []
-    stderr_mock = MagicMock()
-    stderr_mock.readlines.return_value = []
-    mock_client_instance.exec_command.return_value = (None, stdout_mock, stderr_mock)    
+    result = ssh_connection.execute("test command", capture_output=True)
+
+    assert result == (2, "partial output\n", "oops\n")
+
+def _finished_channel(exit_code):
+    channel = MagicMock()
+    channel.exit_status_ready.return_value = True
+    channel.recv_ready.return_value = False
+    channel.recv_stderr_ready.return_value = False
+    channel.recv_exit_status.return_value = exit_code
+    return channel
+
+@patch("selectors.DefaultSelector")
+def test_batch_execute_opens_one_channel_per_command(mock_selector, ssh_connection, mock_paramiko_client):
+    """Test that batch_execute fans commands out over the shared transport and keeps result order"""
+    mock_client, _, _ = mock_paramiko_client
+    transport = mock_client.get_transport.return_value
+    channels = [_finished_channel(0), _finished_channel(3)]
+    transport.open_session.side_effect = channels
     ssh_connection.connect()
-    ssh_connection.execute("test command")
-    mock_client_instance.exec_command.assert_called_once_with("test command")
+
+    exit_codes = ssh_connection.batch_execute(["uptime", "false"])
+
+    assert exit_codes == [0, 3]
+    selector = mock_selector.return_value
+    assert [c.args[0] for c in selector.register.call_args_list] == channels
+    assert [c.args[0] for c in selector.unregister.call_args_list] == channels
+    channels[0].exec_command.assert_called_once_with("uptime")
+    channels[1].exec_command.assert_called_once_with("false")
+    mock_client.exec_command.assert_not_called()
+    selector.select.assert_called_once()
+
+@patch("selectors.DefaultSelector")
+def test_batch_execute_timeout_closes_pending_channels(mock_selector, ssh_connection, mock_paramiko_client):
+    """Test that unfinished channels are closed when the batch times out"""
+    mock_client, _, _ = mock_paramiko_client
+    done, stuck = _finished_channel(0), _finished_channel(0)
+    stuck.exit_status_ready.return_value = False
+    mock_client.get_transport.return_value.open_session.side_effect = [done, stuck]
+    ssh_connection.connect()
+
+    with patch("time.monotonic", side_effect=[0, 0, 2]):
+        with pytest.raises(CommandTimeoutError, match="sleep 60"):
+            ssh_connection.batch_execute(["true", "sleep 60"], timeout=1)
+
+    stuck.close.assert_called_once()
+    done.close.assert_not_called()
+
+@patch("selectors.DefaultSelector")
+def test_batch_execute_closes_opened_channels_when_one_fails_to_open(mock_selector, ssh_connection,
+                                                                   mock_paramiko_client):
+    """Test that a channel open failing part way through closes the channels already opened"""
+    mock_client, _, _ = mock_paramiko_client
+    opened = _finished_channel(0)
+    mock_client.get_transport.return_value.open_session.side_effect = [opened, paramiko.ChannelException(1, "refused")]
+    ssh_connection.connect()
+
+    with pytest.raises(paramiko.ChannelException):
+        ssh_connection.batch_execute(["uptime", "df -h /"])
+
+    opened.close.assert_called_once()
+    mock_selector.return_value.close.assert_called_once()
+
+@patch("selectors.DefaultSelector")
+def test_batch_execute_reconnects_dropped_transport(mock_selector, ssh_connection, mock_paramiko_client):
+    """Test that batch_execute replaces a dead transport first, as execute() does"""
+    mock_client, _, _ = mock_paramiko_client
+    mock_client.get_transport.return_value.open_session.return_value = _finished_channel(0)
+    ssh_connection.connect()
+
+    with patch.object(SSHConnection, "ensure_connected") as mock_ensure:
+        assert ssh_connection.batch_execute(["uptime"]) == [0]
+
+    mock_ensure.assert_called_once()
+
+def test_execute_shell_reuses_one_shell_channel(ssh_connection, mock_paramiko_client):
+    """Test that execute_shell sends commands down one long-lived shell and parses their exit codes"""
+    mock_client, _, _ = mock_paramiko_client
+    shell = MagicMock()
+    shell.closed = False
+    shell.exit_status_ready.return_value = False
+    shell.recv.side_effect = [b"hello\n\n===VMC", b"_RC===0\n", b"\n===VMC_RC===3\n"]
+    mock_client.get_transport.return_value.open_session.return_value = shell
+    ssh_connection.connect()
+
+    assert ssh_connection.execute_shell("echo hello") == 0
+    assert ssh_connection.execute_shell("cd /missing") == 3
+
+    mock_client.get_transport.return_value.open_session.assert_called_once()
+    shell.exec_command.assert_called_once_with('/bin/sh')
+    assert shell.sendall.call_args[0][0].startswith(b"cd /missing\n")
+    mock_client.exec_command.assert_not_called()
+
+def test_execute_shell_untimed_call_clears_earlier_timeout(ssh_connection, mock_paramiko_client):
+    """Test that an untimed command doesn't inherit the timeout a timed one left on the shared shell"""
+    mock_client, _, _ = mock_paramiko_client
+    shell = MagicMock()
+    shell.closed = False
+    shell.exit_status_ready.return_value = False
+    shell.recv.side_effect = [b"\n===VMC_RC===0\n", b"\n===VMC_RC===0\n"]
+    mock_client.get_transport.return_value.open_session.return_value = shell
+    ssh_connection.connect()
+
+    assert ssh_connection.execute_shell("true", timeout=5) == 0
+    assert shell.settimeout.call_args[0][0] > 0
+    assert ssh_connection.execute_shell("sleep 1") == 0
+
+    assert shell.settimeout.call_args == call(None)
+
+def test_execute_shell_falls_back_to_exec_command(ssh_connection, mock_paramiko_client):
+    """Test that execute_shell uses execute() when no shell channel can be opened"""
+    mock_client, _, _ = mock_paramiko_client
+    mock_client.get_transport.return_value.open_session.side_effect = OSError("channel refused")
+    ssh_connection.connect()
+
+    with patch.object(SSHConnection, 'execute', return_value=5) as mock_execute:
+        assert ssh_connection.execute_shell("uptime", timeout=3) == 5
+
+    mock_execute.assert_called_once_with("uptime", timeout=3)
@@ -1,16 +1,24 @@
 import pytest
 from unittest.mock import patch, MagicMock
-import sys
 import os
+import errno
+import itertools
 import subprocess
 import socket
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import struct
+import threading
 from vm_connection import (
-    detect_os_activity, _test_ping_internal, analyze_port_behavior, _test_tcp_stack_internal,
+    detect_os_activity, _test_ping_internal, _icmp_ping, HealthCheckConfig, _split_batched_output,
+    analyze_port_behavior, _test_tcp_stack_internal,
+    _batch_probe, _probe_port, _probe_tiers_settled, _first_per_port,
     check_ssh_connectivity, check_system_services, advanced_os_detection,
-    SSHConnection, CommandTimeoutError
+    SSHConnection, CommandTimeoutError, VMConnectionError
 )
 
+def _batched_output(exit_codes):
+    """Stdout a batched health check command would print for the given exit codes"""
+    return ''.join(f"output\n\n{HealthCheckConfig.BATCH_RC_MARKER}{code}\n" for code in exit_codes)
+
 class TestHealthCheckFunctions:
     """Test suite for individual health check functions"""
     
@@ -19,6 +27,7 @@ class TestHealthCheckFunctions:
         result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
         
         with patch('vm_connection._test_ping_internal', return_value=True), \
+             patch('vm_connection._batch_probe', return_value=[]), \
              patch('vm_connection.analyze_port_behavior', return_value={'quick_rejection': True}), \
              patch('vm_connection._test_tcp_stack_internal', return_value=True):
             
@@ -27,6 +36,51 @@ class TestHealthCheckFunctions:
             assert detection['os_active'] is True
             assert detection['network_responsive'] is True
     
+    def test_detect_os_activity_folds_tier_results_in_order(self):
+        """Test that checks run concurrently are folded back into result in tier order"""
+        result = {'checks_passed': 1, 'checks_failed': 0, 'failed_checks': ['earlier']}
+
+        def failing_tier(message):
+            def check(*args, **kwargs):
+                args[-2]['checks_failed'] += 1
+                args[-2]['failed_checks'].append(message)
+                return False if message != 'port' else {'quick_rejection': False}
+            return check
+
+        with patch('vm_connection._test_ping_internal', side_effect=failing_tier('ping')), \
+             patch('vm_connection._batch_probe', return_value=[]), \
+             patch('vm_connection.analyze_port_behavior', side_effect=failing_tier('port')), \
+             patch('vm_connection._test_tcp_stack_internal', side_effect=failing_tier('tcp')):
+
+            detection = detect_os_activity("test.com", 22, result)
+
+        assert detection['os_active'] is False
+        assert result['checks_passed'] == 1
+        assert result['checks_failed'] == 3
+        assert result['failed_checks'] == ['earlier', 'ping', 'port', 'tcp']
+
+    def test_detect_os_activity_shares_one_probe_pass(self):
+        """Test that port behavior and TCP stack tiers are both derived from one batch of probes"""
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+        quick, slow = 1_000_000, 3_000_000_000
+        measurements = [(22, errno.ECONNREFUSED, quick), (80, errno.ECONNREFUSED, quick), (443, 1, slow),
+                        (22, errno.ECONNREFUSED, quick), (22, errno.ECONNREFUSED, slow)]
+
+        with patch('vm_connection._test_ping_internal', return_value=False), \
+             patch('vm_connection._batch_probe', return_value=measurements) as mock_batch, \
+             patch('vm_connection._probe_port') as mock_probe:
+
+            detection = detect_os_activity("test.com", 22, result)
+
+        mock_batch.assert_called_once()
+        assert mock_batch.call_args.args == ("test.com", [22, 80, 443, 22, 22], HealthCheckConfig.DEFAULT_SOCKET_TIMEOUT)
+        mock_probe.assert_not_called()
+        assert detection['port_behavior'] == 'quick_rejection'
+        assert detection['tcp_stack_active'] is True
+        assert detection['os_active'] is True
+        assert result['checks_passed'] == 2
+
+    @patch.dict(os.environ, {HealthCheckConfig.SUBPROCESS_PING_ENV: '1'})
     @patch('subprocess.run')
     def test_ping_success_on_windows(self, mock_subprocess):
         """Test successful ping on Windows"""
@@ -43,7 +97,9 @@ class TestHealthCheckFunctions:
         assert detection_result['ping_responsive'] is True
         assert detection_result['response_pattern'] == 'normal'
         assert result['checks_passed'] == 1
+        assert mock_subprocess.call_args[0][0] == ['ping', '-n', '3', '-w', '1000', '192.168.1.1']
     
+    @patch.dict(os.environ, {HealthCheckConfig.SUBPROCESS_PING_ENV: '1'})
     @patch('subprocess.run')
     def test_ping_failure(self, mock_subprocess):
         """Test ping failure"""
@@ -59,6 +115,22 @@ class TestHealthCheckFunctions:
         assert result['checks_failed'] == 1
         assert 'VM not responding to ping' in result['failed_checks']
     
+    @patch.dict(os.environ, {HealthCheckConfig.SUBPROCESS_PING_ENV: '1'})
+    @patch('subprocess.run')
+    def test_ping_looks_up_platform_once(self, mock_subprocess):
+        """Test that repeated pings reuse the cached platform lookup"""
+        mock_subprocess.return_value.returncode = 0
+        mock_subprocess.return_value.stdout = ""
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+
+        with patch('platform.system', return_value='Linux') as mock_system:
+            for _ in range(3):
+                _test_ping_internal("192.168.1.1", result, {})
+
+        mock_system.assert_called_once()
+        assert mock_subprocess.call_args[0][0][1] == '-c'
+
+    @patch.dict(os.environ, {HealthCheckConfig.SUBPROCESS_PING_ENV: '1'})
     @patch('subprocess.run')
     def test_ping_timeout_exception(self, mock_subprocess):
         """Test ping command timeout"""
@@ -72,18 +144,89 @@ class TestHealthCheckFunctions:
         assert success is False
         assert result['checks_failed'] == 1
     
+    @patch('subprocess.run')
+    def test_ping_uses_in_process_probe_by_default(self, mock_subprocess):
+        """Test that ping stops at the first echo reply without spawning a process"""
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+        detection_result = {'ping_responsive': False, 'response_pattern': 'timeout'}
+
+        with patch.dict(os.environ, clear=True), \
+             patch('vm_connection._icmp_ping', side_effect=[(False, None), (True, 0.002)]) as mock_ping:
+            success = _test_ping_internal("192.168.1.1", result, detection_result)
+
+        assert success is True
+        assert mock_ping.call_count == 2
+        assert detection_result['response_pattern'] == 'normal'
+        mock_subprocess.assert_not_called()
+
     @patch('socket.socket')
-    def test_analyze_port_behavior_quick_rejection(self, mock_socket):
-        """Test port behavior analysis with quick rejections"""
+    def test_icmp_ping_falls_back_to_tcp_probe(self, mock_socket):
+        """Test that a refused ICMP socket falls back to a TCP connect, where refusal still means up"""
         mock_sock = MagicMock()
-        mock_socket.return_value = mock_sock
-        mock_sock.connect_ex.return_value = 111  # Connection refused
-        
+        mock_sock.connect_ex.return_value = errno.ECONNREFUSED
+        mock_socket.side_effect = [PermissionError(), mock_sock]
+
+        ok, _ = _icmp_ping("192.168.1.1", 1)
+
+        assert ok is True
+        mock_sock.connect_ex.assert_called_once_with(("192.168.1.1", HealthCheckConfig.PING_FALLBACK_PORT))
+
+    @patch('socket.socket')
+    def test_icmp_ping_ignores_replies_to_other_pings(self, mock_socket):
+        """Test that only an echo reply from the host, carrying this ping's identifier and sequence, counts"""
+        def echo_reply(ident, sequence):
+            return struct.pack('!BBHHH', 0, 0, 0, ident, sequence) + b'vm_connection'
+
+        mock_sock = mock_socket.return_value
+        mock_sock.getsockname.return_value = ('0.0.0.0', 4242)  # Linux hands out the identifier
+        mock_sock.recvfrom.side_effect = [
+            (echo_reply(4242, 7), ('10.0.0.9', 0)),     # another host
+            (echo_reply(4242, 8), ('192.168.1.1', 0)),  # another thread's ping
+            (echo_reply(4242, 7), ('192.168.1.1', 0)),
+        ]
+
+        with patch('vm_connection._ICMP_SEQUENCE', itertools.count(7)):
+            ok, rtt = _icmp_ping("192.168.1.1", 1)
+
+        assert ok is True
+        assert rtt is not None
+        assert mock_sock.recvfrom.call_count == 3
+
+    @patch('socket.socket')
+    def test_icmp_ping_stray_traffic_does_not_extend_timeout(self, mock_socket):
+        """Test that a stream of unrelated ICMP packets can't keep the ping waiting past its timeout"""
+        mock_sock = mock_socket.return_value
+        mock_sock.getsockname.return_value = ('0.0.0.0', 4242)
+        mock_sock.recvfrom.return_value = (struct.pack('!BBHHH', 3, 1, 0, 0, 0) + b'x' * 20, ('192.168.1.1', 0))
+
+        with patch('time.perf_counter', side_effect=[0.0, 0.5, 1.5]):
+            ok, rtt = _icmp_ping("192.168.1.1", 1)
+
+        assert (ok, rtt) == (False, None)
+        mock_sock.recvfrom.assert_called_once()
+        mock_sock.settimeout.assert_called_once_with(0.5)
+
+    @patch('socket.socket')
+    def test_ping_fallback_uses_the_vm_ssh_port(self, mock_socket):
+        """Test that the TCP fallback handshakes with the port the VM's SSH listens on"""
+        mock_sock = MagicMock()
+        mock_sock.connect_ex.return_value = 0
+        mock_socket.side_effect = [PermissionError(), mock_sock]
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+
+        with patch.dict(os.environ, clear=True):
+            success = _test_ping_internal("192.168.1.1", result, {}, port=2222)
+
+        assert success is True
+        mock_sock.connect_ex.assert_called_once_with(("192.168.1.1", 2222))
+
+    @patch('vm_connection._probe_port', return_value=(111, 100_000_000))  # Quick refusals
+    def test_analyze_port_behavior_quick_rejection(self, mock_probe):
+        """Test port behavior analysis with quick rejections"""
         result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
         detection_result = {'port_behavior': 'unknown'}
         
-        with patch('time.time', side_effect=[0, 0.1, 0, 0.1, 0, 0.1]):  # Quick responses
-            port_analysis = analyze_port_behavior("test.com", 22, result, detection_result)
+        port_analysis = analyze_port_behavior("test.com", 22, result, detection_result)
         
         assert port_analysis['quick_rejection'] is True
         assert detection_result['port_behavior'] == 'quick_rejection'
@@ -106,22 +249,110 @@ class TestHealthCheckFunctions:
         assert result['checks_failed'] == 1
     
     @patch('socket.socket')
-    def test_tcp_stack_responsiveness(self, mock_socket):
-        """Test TCP stack responsiveness detection"""
+    def test_analyze_port_behavior_probes_ports_concurrently(self, mock_socket):
+        """Test that every port probe is in flight at the same time"""
+        barrier = threading.Barrier(4, timeout=5)
+        mock_sock = MagicMock()
+        mock_socket.return_value = mock_sock
+
+        def connect_ex(address):
+            barrier.wait()  # Only releases once all four probes are waiting
+            return 0
+
+        mock_sock.connect_ex.side_effect = connect_ex
+
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+        detection_result = {'port_behavior': 'unknown'}
+
+        port_analysis = analyze_port_behavior("test.com", 2222, result, detection_result)
+
+        assert not barrier.broken
+        assert port_analysis['any_response'] is True
+        assert mock_sock.close.call_count == 4
+
+    @patch('socket.socket')
+    def test_analyze_port_behavior_probes_each_port_once(self, mock_socket):
+        """Test that an SSH port already among the default ports is only probed once"""
+        mock_sock = MagicMock()
+        mock_socket.return_value = mock_sock
+        mock_sock.connect_ex.return_value = 0
+
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+        detection_result = {'port_behavior': 'unknown'}
+
+        analyze_port_behavior("test.com", 22, result, detection_result)
+
+        probed = sorted(call.args[0][1] for call in mock_sock.connect_ex.call_args_list)
+        assert probed == [22, 80, 443]
+
+    def test_batch_probe_stops_once_settled(self):
+        """Test that a settled batch returns without waiting on the probes still outstanding"""
+        release = threading.Event()
+
+        def probe(host, port, timeout):
+            if port == 443:
+                release.wait(5)  # A filtered port sitting out its timeout
+                return 1, 3_000_000_000
+            return errno.ECONNREFUSED, 1_000_000
+
+        with patch('vm_connection._probe_port', side_effect=probe):
+            measurements = _batch_probe("test.com", [22, 80, 443, 22, 22], 2,
+                                        settled=lambda m: _probe_tiers_settled(22, m))
+        release.set()
+
+        assert 443 not in [p for p, _, _ in measurements]
+        assert _probe_tiers_settled(22, measurements)
+
+    def test_probe_tiers_settled_needs_both_tiers(self):
+        """Test that quick rejections alone don't settle the batch while the TCP stack tier is undecided"""
+        quick = 1_000_000
+        rejections = [(22, errno.ECONNREFUSED, quick), (80, errno.ECONNREFUSED, quick)]
+
+        assert _probe_tiers_settled(22, rejections) is False
+        assert _probe_tiers_settled(22, rejections + [(22, errno.ECONNREFUSED, quick)]) is True
+
+    def test_first_per_port_keeps_earliest_measurement(self):
+        """Test that repeat probes of a port don't replace its first measurement"""
+        measurements = [(22, 0, 5), (80, 111, 7), (22, 111, 9)]
+
+        assert _first_per_port(measurements) == {22: (0, 5), 80: (111, 7)}
+
+    @patch('socket.socket')
+    def test_probe_port_times_connect_and_resets_on_close(self, mock_socket):
+        """Test that a probe reports connect_ex's code with its elapsed nanoseconds and closes with a reset"""
         mock_sock = MagicMock()
         mock_socket.return_value = mock_sock
         mock_sock.connect_ex.return_value = 111  # Connection refused
-        
+
+        with patch('time.perf_counter_ns', side_effect=[1_000, 101_000]):
+            assert _probe_port("test.com", 22, 1) == (111, 100_000)
+
+        mock_sock.setsockopt.assert_called_with(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        mock_sock.close.assert_called_once()
+
+    @patch('vm_connection._probe_port', return_value=(111, 100_000_000))  # Quick refusals
+    def test_tcp_stack_responsiveness(self, mock_probe):
+        """Test TCP stack responsiveness detection"""
         result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
         detection_result = {'tcp_stack_active': False}
         
-        with patch('time.time', side_effect=[0, 0.1, 0, 0.1, 0, 0.1]):  # Quick responses
-            tcp_active = _test_tcp_stack_internal("test.com", 22, result, detection_result)
+        tcp_active = _test_tcp_stack_internal("test.com", 22, result, detection_result)
         
         assert tcp_active is True
         assert detection_result['tcp_stack_active'] is True
         assert result['checks_passed'] == 1
 
+    @patch('vm_connection._probe_port', return_value=(111, HealthCheckConfig.QUICK_RESPONSE_THRESHOLD_NS))
+    def test_tcp_stack_slow_responses_are_not_quick(self, mock_probe):
+        """Test that refusals slower than the nanosecond threshold don't count as TCP stack activity"""
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+        detection_result = {'tcp_stack_active': False}
+        
+        tcp_active = _test_tcp_stack_internal("test.com", 22, result, detection_result)
+        
+        assert tcp_active is False
+        assert result['checks_failed'] == 1
+
 class TestSSHHealthChecks:
     """Test SSH-related health check functions"""
     
@@ -146,9 +377,8 @@ class TestSSHHealthChecks:
         mock_ssh_connection.execute.assert_called_once_with('echo "health_check"', timeout=5)
     
     def test_check_ssh_connectivity_reconnect_needed(self, mock_ssh_connection):
-        """Test SSH connectivity when reconnection is needed"""
+        """Test SSH connectivity goes through ensure_connected, which reconnects when needed"""
         mock_ssh_connection.client.get_transport.return_value = None
-        mock_ssh_connection.connect.return_value = None
         mock_ssh_connection.execute.return_value = 0
         
         result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
@@ -157,7 +387,19 @@ class TestSSHHealthChecks:
         
         assert ssh_ok is True
         assert result['checks_passed'] == 2
-        mock_ssh_connection.connect.assert_called_once()
+        mock_ssh_connection.ensure_connected.assert_called_once()
+    
+    def test_check_ssh_connectivity_reconnect_failure(self, mock_ssh_connection):
+        """Test SSH connectivity when the connection can't be re-established"""
+        mock_ssh_connection.ensure_connected.side_effect = VMConnectionError("unreachable")
+        
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+        
+        ssh_ok = check_ssh_connectivity(mock_ssh_connection, result)
+        
+        assert ssh_ok is False
+        assert result['failed_checks'] == ['SSH connection failed: unreachable']
+        mock_ssh_connection.execute.assert_not_called()
     
     def test_check_ssh_connectivity_command_timeout(self, mock_ssh_connection):
         """Test SSH connectivity when command times out"""
@@ -174,29 +416,31 @@ class TestSSHHealthChecks:
     
     def test_check_system_services_medium_level(self, mock_ssh_connection):
         """Test system services check at medium level"""
-        mock_ssh_connection.execute.return_value = 0
+        mock_ssh_connection.execute.return_value = (0, _batched_output([0, 0, 0]), '')
         
         result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
         
         check_system_services(mock_ssh_connection, result, level='medium')
         
         assert result['checks_passed'] == 3  # uptime, df, ps
-        assert mock_ssh_connection.execute.call_count == 3
+        assert mock_ssh_connection.execute.call_count == 1
+        command = mock_ssh_connection.execute.call_args[0][0]
+        assert 'uptime' in command and 'df -h /' in command and 'ps aux' in command
     
     def test_check_system_services_thorough_level(self, mock_ssh_connection):
         """Test system services check at thorough level"""
-        mock_ssh_connection.execute.return_value = 0
+        mock_ssh_connection.execute.return_value = (0, _batched_output([0] * 6), '')
         
         result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
         
         check_system_services(mock_ssh_connection, result, level='thorough')
         
         assert result['checks_passed'] == 6  # All checks including memory, who, systemctl
-        assert mock_ssh_connection.execute.call_count == 6
+        assert mock_ssh_connection.execute.call_count == 1
     
     def test_check_system_services_with_failures(self, mock_ssh_connection):
         """Test system services check with some failures"""
-        mock_ssh_connection.execute.side_effect = [0, 1, 0]  # Mixed results
+        mock_ssh_connection.execute.return_value = (0, _batched_output([0, 1, 0]), '')  # Mixed results
         
         result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
         
@@ -204,18 +448,39 @@ class TestSSHHealthChecks:
         
         assert result['checks_passed'] == 2
         assert result['checks_failed'] == 1
-        assert len(result['failed_checks']) == 1
+        assert result['failed_checks'] == ['Disk space check failed']
+    
+    def test_split_batched_output_marks_missing_commands(self):
+        """Test that commands with no exit status marker come back as unreported"""
+        output = "up 3 days\n\n===VMC_RC===0\nno newline\n===VMC_RC===2\n"
+        
+        sections = _split_batched_output(output, 3)
+        
+        assert sections == [(0, 'up 3 days\n'), (2, 'no newline'), (None, '')]
     
     def test_advanced_os_detection(self, mock_ssh_connection):
         """Test advanced OS detection via SSH"""
-        mock_ssh_connection.execute.return_value = 0
+        mock_ssh_connection.execute.return_value = (0, _batched_output([0, 0, 0]), '')
         
         result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
         
         advanced_os_detection(mock_ssh_connection, result)
         
         assert result['checks_passed'] == 3  # kernel, uname, os-release
-        assert mock_ssh_connection.execute.call_count == 3
+        assert mock_ssh_connection.execute.call_count == 1
+        command = mock_ssh_connection.execute.call_args[0][0]
+        assert '/proc/version' in command and 'uname -a' in command and 'os-release' in command
+    
+    def test_advanced_os_detection_batch_error(self, mock_ssh_connection):
+        """Test that a failed batch counts every OS detection check as failed"""
+        mock_ssh_connection.execute.side_effect = CommandTimeoutError("batch", 9)
+        
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+        
+        advanced_os_detection(mock_ssh_connection, result)
+        
+        assert result['checks_passed'] == 0
+        assert result['checks_failed'] == 3
     
     def test_check_system_services_no_client(self):
         """Test system services check when no SSH client available"""
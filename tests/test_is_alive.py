@@ -1,11 +1,6 @@
-import pytest
 from unittest.mock import patch
 from vm_connection import SSHConnection
 
-@pytest.fixture
-def ssh_connection():
-    return SSHConnection(host="test.example.com", user="testuser", key_path="/path/to/key")
-
 @patch("vm_connection.detect_os_activity")
 def test_is_alive_returns_false_when_vm_unresponsive(mock_os_detect, ssh_connection):
     def mock_os(host, port, result):
@@ -16,6 +11,17 @@ def test_is_alive_returns_false_when_vm_unresponsive(mock_os_detect, ssh_connect
     mock_os_detect.side_effect = mock_os
     assert ssh_connection.is_alive() is False
 
+@patch("vm_connection.detect_os_activity")
+@patch("vm_connection.check_ssh_connectivity")
+def test_is_alive_skips_ssh_when_nothing_answers(mock_ssh_check, mock_os_detect, ssh_connection):
+    """Test that a VM silent on every network probe isn't made to wait out an SSH connect"""
+    def mock_os(host, port, result):
+        result['checks_failed'] = 3
+        return {'os_active': False}
+    mock_os_detect.side_effect = mock_os
+    assert ssh_connection.is_alive(level='thorough') is False
+    mock_ssh_check.assert_not_called()
+
 @patch("vm_connection.detect_os_activity")
 def test_is_alive_sets_confidence_correctly(mock_os_detect, ssh_connection):
     def side_effect(host, port, result):
@@ -43,3 +49,19 @@ def test_is_alive_returns_true_when_vm_responsive(mock_ssh_check, mock_os_detect
     result = ssh_connection.is_alive()
     assert result is True
     mock_os_detect.assert_called_once()
+
+@patch("vm_connection.detect_os_activity")
+def test_is_alive_reuses_verdict_within_ttl(mock_os_detect):
+    """Test that calls within is_alive_ttl share one check cascade per level"""
+    def side_effect(host, port, result):
+        result['checks_passed'] = 3
+        return {'os_active': True}
+    mock_os_detect.side_effect = side_effect
+    conn = SSHConnection(host="test.example.com", user="testuser", key_path="/path/to/key", is_alive_ttl=0.5)
+
+    with patch("time.monotonic", side_effect=[0, 0.2, 0.6, 0.6]):
+        assert conn.is_alive(level='basic') is True
+        assert conn.is_alive(level='basic') is True
+        assert conn.is_alive(level='basic') is True
+
+    assert mock_os_detect.call_count == 2
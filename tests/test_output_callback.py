@@ -1,29 +1,19 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
-@patch("select.select")
+@patch("selectors.DefaultSelector")
 @patch("paramiko.SSHClient")
-def test_execute_calls_output_callback_for_each_line(mock_sshclient, mock_select, ssh_connection):
+def test_execute_calls_output_callback_for_each_line(mock_sshclient, mock_selector, ssh_connection, paramiko_mocks):
     """Test that output_callback is called for each line of streamed output"""
-    mock_client = MagicMock()
+    mock_client, stdout, _ = paramiko_mocks
     mock_sshclient.return_value = mock_client
     
-    stdout = MagicMock()
-    stdout.channel.exit_status_ready.side_effect = [False, False, False, True]
-    stdout.readline.side_effect = ["line1\n", "line2\n", "line3\n", ""]
+    stdout.channel.exit_status_ready.return_value = True
+    stdout.channel.recv_ready.side_effect = [True, False, True, False, True, False, False, False]
+    stdout.channel.recv.side_effect = [b"line1\n", b"line2\n", b"line3\n"]
+    stdout.channel.recv_stderr_ready.return_value = False
     stdout.channel.recv_exit_status.return_value = 0
-    stdout.readlines.return_value = []
     
-    stderr = MagicMock()
-    stderr.readlines.return_value = []
-    
-    mock_client.exec_command.return_value = (None, stdout, stderr)
-    mock_select.side_effect = [
-        ([stdout.channel], [], []),
-        ([stdout.channel], [], []),
-        ([stdout.channel], [], []),
-        ([], [], [])
-    ]
     
     callback_calls = []
     def test_callback(line):
@@ -32,4 +22,41 @@ def test_execute_calls_output_callback_for_each_line(mock_sshclient, mock_select
     ssh_connection.connect()
     ssh_connection.execute("test command", output_callback=test_callback)
     
-    assert callback_calls == ["line1", "line2", "line3"]
\ No newline at end of file
+    assert callback_calls == ["line1", "line2", "line3"]
+
+@patch("selectors.DefaultSelector")
+@patch("paramiko.SSHClient")
+def test_execute_reassembles_lines_split_across_chunks(mock_sshclient, mock_selector, ssh_connection, paramiko_mocks):
+    """Test that lines spanning several recv() chunks reach the callback whole, stderr included"""
+    mock_client, stdout, _ = paramiko_mocks
+    mock_sshclient.return_value = mock_client
+
+    stdout.channel.exit_status_ready.return_value = True
+    stdout.channel.recv_ready.side_effect = [True, True, False, False, False]
+    stdout.channel.recv.side_effect = [b"first li", b"ne\nsecond line\nno newline"]
+    stdout.channel.recv_stderr_ready.side_effect = [True, False, False, False]
+    stdout.channel.recv_stderr.return_value = b"warning\n"
+    stdout.channel.recv_exit_status.return_value = 0
+
+    callback_calls = []
+    ssh_connection.connect()
+    ssh_connection.execute("test command", output_callback=callback_calls.append)
+
+    assert callback_calls == ["first line", "second line", "STDERR: warning", "no newline"]
+
+@patch("selectors.DefaultSelector")
+@patch("paramiko.SSHClient")
+def test_execute_checks_exit_status_only_when_idle(mock_sshclient, mock_selector, ssh_connection, paramiko_mocks, mock_stdout):
+    """Test that wakeups carrying output skip the exit status check"""
+    mock_client, _, stderr = paramiko_mocks
+    mock_sshclient.return_value = mock_client
+    stdout = mock_stdout(["line1\n", "line2\n", "line3\n"])
+    stdout.channel.exit_status_ready.side_effect = None
+    stdout.channel.exit_status_ready.return_value = True
+    mock_client.exec_command.return_value = (None, stdout, stderr)
+
+    ssh_connection.connect()
+    ssh_connection.execute("test command", output_callback=lambda line: None)
+
+    assert mock_selector.return_value.select.call_count == 4
+    stdout.channel.exit_status_ready.assert_called_once()
@@ -1,9 +1,7 @@
 import pytest
+import time
 from unittest.mock import patch, MagicMock
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from vm_connection import VMRebootDetectedError, SSHConnection, VMConnectionError
+from vm_connection import VMRebootDetectedError, SSHConnection, VMConnectionError, CommandTimeoutError, HealthCheckConfig
 
 class TestRebootDetection:
     """Comprehensive tests for reboot detection functionality"""
@@ -11,6 +9,8 @@ class TestRebootDetection:
     @pytest.fixture
     def connected_ssh(self, ssh_connection):
         ssh_connection.client = MagicMock()
+        # No shell channel, so boot ID reads take the exec_command path
+        ssh_connection.client.get_transport.return_value.open_session.side_effect = OSError("channel refused")
         return ssh_connection
     
     @patch.object(SSHConnection, "_get_boot_id")
@@ -36,10 +36,11 @@ class TestRebootDetection:
     def test_record_boot_id_success(self, mock_sshclient, ssh_connection):
         """Test successful boot ID recording"""
         mock_client = MagicMock()
+        mock_client.get_transport.return_value.open_session.side_effect = OSError("channel refused")
         mock_sshclient.return_value = mock_client
         
         stdout_mock = MagicMock()
-        stdout_mock.read.return_value = b"abc123-def456-ghi789"
+        stdout_mock.channel.recv.side_effect = [b"4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37", b""]
         stderr_mock = MagicMock()
         stderr_mock.read.return_value = b""
         
@@ -48,13 +49,13 @@ class TestRebootDetection:
         ssh_connection.connect()
         ssh_connection.record_boot_id()
         
-        assert ssh_connection.last_boot_id == "abc123-def456-ghi789"
+        assert ssh_connection.last_boot_id == "4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37"
         mock_client.exec_command.assert_called_with("cat /proc/sys/kernel/random/boot_id")
     
     def test_get_boot_id_empty_response(self, connected_ssh):
         """Test _get_boot_id when command returns empty response"""
         stdout_mock = MagicMock()
-        stdout_mock.read.return_value = b""  # Empty response
+        stdout_mock.channel.recv.return_value = b""  # Empty response
         stderr_mock = MagicMock()
         stderr_mock.read.return_value = b"No such file or directory"
         
@@ -63,17 +64,60 @@ class TestRebootDetection:
         with pytest.raises(VMConnectionError, match="Failed to get boot ID"):
             connected_ssh._get_boot_id()
     
+    def test_get_boot_id_rejects_non_uuid_output(self, connected_ssh):
+        """Test that stray output that isn't a boot ID is not mistaken for one"""
+        stdout_mock = MagicMock()
+        stdout_mock.channel.recv.side_effect = [b"Welcome to Ubuntu\n", b""]
+        stderr_mock = MagicMock()
+        stderr_mock.read.return_value = b""
+        
+        connected_ssh.client.exec_command.return_value = (None, stdout_mock, stderr_mock)
+        
+        with pytest.raises(VMConnectionError, match="Failed to get boot ID"):
+            connected_ssh._get_boot_id()
+    
     def test_get_boot_id_whitespace_handling(self, connected_ssh):
         """Test that _get_boot_id properly strips whitespace"""
         stdout_mock = MagicMock()
-        stdout_mock.read.return_value = b"  abc123-def456-ghi789  \n"
+        stdout_mock.channel.recv.side_effect = [b"  4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37  \n", b""]
         stderr_mock = MagicMock()
         stderr_mock.read.return_value = b""
         
         connected_ssh.client.exec_command.return_value = (None, stdout_mock, stderr_mock)
         
         boot_id = connected_ssh._get_boot_id()
-        assert boot_id == "abc123-def456-ghi789"
+        assert boot_id == "4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37"
+    
+    def test_get_boot_id_returns_without_waiting_for_eof(self, connected_ssh):
+        """Test that _get_boot_id stops reading once a full UUID arrived, even split across chunks"""
+        stdout_mock = MagicMock()
+        stdout_mock.channel.recv.side_effect = [b"4d2e1c8a-7f3b-4a91-", b"b6de-0c5f8e2a1b37\n"]
+        
+        connected_ssh.client.exec_command.return_value = (None, stdout_mock, MagicMock())
+        
+        assert connected_ssh._get_boot_id() == "4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37"
+        assert stdout_mock.channel.recv.call_count == 2
+        stdout_mock.channel.close.assert_called_once()
+
+    def test_get_boot_id_reuses_shell_channel(self, ssh_connection):
+        """Test that repeated boot ID reads go down the one long-lived shell instead of a channel each"""
+        ssh_connection.client = MagicMock()
+        shell = MagicMock()
+        shell.closed = False
+        shell.exit_status_ready.return_value = False
+        shell.recv.side_effect = [b"4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37\n\n===VMC_RC===0\n",
+                                  b"4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37\n\n===VMC_RC===0\n",
+                                  b"\n===VMC_RC===0\n"]
+        ssh_connection.client.get_transport.return_value.open_session.return_value = shell
+
+        assert ssh_connection._get_boot_id() == "4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37"
+        assert ssh_connection._get_boot_id() == "4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37"
+        # The boot ID reads are timed; a later untimed command must not inherit their timeout
+        assert ssh_connection.execute_shell("sleep 1") == 0
+
+        shell.settimeout.assert_called_with(None)
+        ssh_connection.client.get_transport.return_value.open_session.assert_called_once()
+        ssh_connection.client.exec_command.assert_not_called()
     
     @patch.object(SSHConnection, "_get_boot_id")
     def test_check_reboot_propagates_get_boot_id_errors(self, mock_get_boot_id, connected_ssh):
@@ -83,3 +127,54 @@ class TestRebootDetection:
         
         with pytest.raises(VMConnectionError, match="SSH command failed"):
             connected_ssh.check_reboot()
+    
+    def test_fetch_host_state_reads_boot_id_with_service_checks(self, connected_ssh):
+        """Test that one batched command yields both the boot ID and the service check tallies"""
+        marker = HealthCheckConfig.BATCH_RC_MARKER
+        output = (f"4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37\n\n{marker}0\n"
+                  f"up 3 days\n\n{marker}0\n/dev/sda1 40%\n\n{marker}1\nPID CMD\n\n{marker}0\n")
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+        
+        with patch.object(SSHConnection, "execute", return_value=(0, output, "")) as mock_execute:
+            boot_id = connected_ssh.fetch_host_state(result)
+        
+        assert boot_id == "4d2e1c8a-7f3b-4a91-b6de-0c5f8e2a1b37"
+        assert connected_ssh.last_boot_id == boot_id
+        assert result['checks_passed'] == 2
+        assert result['failed_checks'] == ['Disk space check failed']
+        mock_execute.assert_called_once()
+    
+    def test_fetch_host_state_tallies_failed_batch(self, connected_ssh):
+        """Test that a batched command that times out fails every service check and reads no boot ID"""
+        result = {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+        
+        with patch.object(SSHConnection, "execute", side_effect=CommandTimeoutError("batch", 20)):
+            boot_id = connected_ssh.fetch_host_state(result)
+        
+        assert boot_id is None
+        assert connected_ssh.last_boot_id is None
+        assert result['checks_failed'] == 3
+        assert result['failed_checks'][0].startswith('System uptime check error:')
+    
+    @patch.object(SSHConnection, "_get_boot_id")
+    def test_check_reboot_reuses_recently_fetched_boot_id(self, mock_get_boot_id, connected_ssh):
+        """Test that check_reboot compares against a fresh fetch_host_state() read without another round trip"""
+        connected_ssh.last_boot_id = "old-boot-id"
+        
+        with patch("time.monotonic", side_effect=[100, 102]):
+            connected_ssh._observed_boot_id = ("new-boot-id", time.monotonic())
+            with pytest.raises(VMRebootDetectedError):
+                connected_ssh.check_reboot()
+        
+        mock_get_boot_id.assert_not_called()
+    
+    @patch.object(SSHConnection, "_get_boot_id", return_value="old-boot-id")
+    def test_check_reboot_rereads_stale_boot_id(self, mock_get_boot_id, connected_ssh):
+        """Test that an old fetch_host_state() read is not trusted"""
+        connected_ssh.last_boot_id = "old-boot-id"
+        
+        with patch("time.monotonic", side_effect=[100, 100 + SSHConnection.BOOT_ID_MAX_AGE + 1]):
+            connected_ssh._observed_boot_id = ("new-boot-id", time.monotonic())
+            connected_ssh.check_reboot()
+        
+        mock_get_boot_id.assert_called_once()
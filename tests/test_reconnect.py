@@ -1,14 +1,15 @@
 import pytest
 from unittest.mock import patch, MagicMock
 import paramiko
-from vm_connection import VMConnectionError
+from vm_connection import SSHConnection, VMConnectionError
 
 class TestReconnectFunctionality:
     """Comprehensive tests for reconnection functionality"""
     
+    @patch("random.uniform", return_value=1.0)
     @patch("time.sleep", return_value=None)
     @patch("paramiko.SSHClient")
-    def test_reconnect_retries_and_succeeds(self, mock_sshclient, mock_sleep, ssh_connection):
+    def test_reconnect_retries_and_succeeds(self, mock_sshclient, mock_sleep, mock_uniform, ssh_connection):
         """Test successful reconnection after initial failure"""
         mock_client = MagicMock()
         mock_sshclient.return_value = mock_client
@@ -23,7 +24,7 @@ class TestReconnectFunctionality:
     @patch("time.sleep", return_value=None)
     def test_reconnect_all_attempts_fail(self, mock_sleep, ssh_connection):
         """Test reconnect when all retry attempts fail"""
-        with patch.object(ssh_connection, 'connect', side_effect=VMConnectionError("Connection failed")):
+        with patch.object(SSHConnection, 'connect', side_effect=VMConnectionError("Connection failed")):
             result = ssh_connection.reconnect(retries=3, delay=0.5)
             
             assert result is False
@@ -32,7 +33,7 @@ class TestReconnectFunctionality:
     @patch("time.sleep", return_value=None)
     def test_reconnect_first_attempt_succeeds(self, mock_sleep, ssh_connection):
         """Test reconnect when first attempt succeeds"""
-        with patch.object(ssh_connection, 'connect', return_value=None):
+        with patch.object(SSHConnection, 'connect', return_value=None):
             result = ssh_connection.reconnect(retries=3, delay=1)
             
             assert result is True
@@ -43,7 +44,7 @@ class TestReconnectFunctionality:
         mock_client = MagicMock()
         ssh_connection.client = mock_client
         
-        with patch.object(ssh_connection, 'connect', return_value=None) as mock_connect:
+        with patch.object(SSHConnection, 'connect', return_value=None) as mock_connect:
             result = ssh_connection.reconnect(retries=1)
             
             # Should close existing connection first
@@ -62,8 +63,40 @@ class TestReconnectFunctionality:
             None  # Success on third attempt
         ]
         
-        with patch.object(ssh_connection, 'connect', side_effect=exceptions):
+        with patch.object(SSHConnection, 'connect', side_effect=exceptions):
             result = ssh_connection.reconnect(retries=3, delay=0.1)
             
             assert result is True
             assert mock_sleep.call_count == 2
+    
+    @patch("random.uniform", return_value=1.0)
+    @patch("time.sleep", return_value=None)
+    def test_reconnect_backs_off_exponentially(self, mock_sleep, mock_uniform, ssh_connection):
+        """Test that the pause between attempts doubles each time"""
+        with patch.object(SSHConnection, 'connect', side_effect=VMConnectionError("Connection failed")):
+            result = ssh_connection.reconnect(retries=4, delay=1)
+            
+            assert result is False
+            assert [c.args[0] for c in mock_sleep.call_args_list] == [1, 2, 4]
+    
+    @patch("random.uniform", return_value=1.0)
+    @patch("time.sleep", return_value=None)
+    def test_reconnect_stops_at_max_wait(self, mock_sleep, mock_uniform, ssh_connection):
+        """Test that backoff is clipped to, and stops at, the max_wait deadline"""
+        with patch.object(SSHConnection, 'connect', side_effect=VMConnectionError("Connection failed")), \
+             patch("time.monotonic", side_effect=[0, 0, 1, 4, 5]):
+            result = ssh_connection.reconnect(retries=5, delay=1, max_wait=5)
+            
+            assert result is False
+            assert [c.args[0] for c in mock_sleep.call_args_list] == [1, 2, 1]
+
+    @patch("random.uniform", side_effect=[0.5, 1.5, 1.5])
+    @patch("time.sleep", return_value=None)
+    def test_reconnect_jitters_and_caps_backoff(self, mock_sleep, mock_uniform, ssh_connection):
+        """Test that each pause is jittered by +/-50% and the base delay stops growing at max_delay"""
+        with patch.object(SSHConnection, 'connect', side_effect=VMConnectionError("Connection failed")):
+            result = ssh_connection.reconnect(retries=4, delay=10, max_wait=600, max_delay=15)
+            
+            assert result is False
+            assert [c.args[0] for c in mock_sleep.call_args_list] == [5, 22.5, 22.5]
+            mock_uniform.assert_called_with(0.5, 1.5)
@@ -0,0 +1,184 @@
+import os
+import threading
+from unittest.mock import patch, MagicMock
+from vm_connection import SSHConnection, VMConnection, _TRANSPORT_POOL
+
+
+class TestTransportPool:
+    """Tests for transport reuse across SSHConnection instances"""
+
+    @patch("paramiko.SSHClient")
+    def test_second_connect_reuses_active_transport(self, mock_sshclient):
+        """Test that a repeat connect to the same VM skips the SSH handshake"""
+        first_client, second_client = MagicMock(), MagicMock()
+        mock_sshclient.side_effect = [first_client, second_client]
+        transport = first_client.get_transport.return_value
+        transport.is_active.return_value = True
+
+        SSHConnection("test.example.com", "testuser", "/path/to/key").connect()
+        conn = SSHConnection("test.example.com", "testuser", "/path/to/key")
+        conn.connect()
+
+        first_client.connect.assert_called_once()
+        second_client.connect.assert_not_called()
+        assert conn.client._transport is transport
+
+    @patch("paramiko.SSHClient")
+    def test_inactive_transport_is_replaced(self, mock_sshclient):
+        """Test that a dead pooled transport triggers a fresh connection"""
+        first_client, second_client = MagicMock(), MagicMock()
+        mock_sshclient.side_effect = [first_client, second_client]
+        first_client.get_transport.return_value.is_active.return_value = False
+
+        SSHConnection("test.example.com", "testuser", "/path/to/key").connect()
+        SSHConnection("test.example.com", "testuser", "/path/to/key").connect()
+
+        second_client.connect.assert_called_once()
+        assert _TRANSPORT_POOL[("test.example.com", 22, "testuser", "/path/to/key")] is second_client.get_transport.return_value
+
+    @patch("vm_connection._TRANSPORT_POOL_SIZE", 2)
+    @patch("paramiko.SSHClient")
+    def test_pool_closes_least_recently_used_transport(self, mock_sshclient):
+        """Test that the pool stays within its size by closing the transport used longest ago"""
+        clients = [MagicMock() for _ in range(4)]
+        mock_sshclient.side_effect = clients
+        for client in clients:
+            client.get_transport.return_value.is_active.return_value = True
+
+        SSHConnection("a.example.com", "testuser", "/path/to/key").connect()
+        SSHConnection("b.example.com", "testuser", "/path/to/key").connect()
+        SSHConnection("a.example.com", "testuser", "/path/to/key").connect()  # a is now the most recent
+        SSHConnection("c.example.com", "testuser", "/path/to/key").connect()
+
+        clients[1].get_transport.return_value.close.assert_called_once()
+        clients[0].get_transport.return_value.close.assert_not_called()
+        assert [key[0] for key in _TRANSPORT_POOL] == ["a.example.com", "c.example.com"]
+
+    @patch("paramiko.SSHClient")
+    def test_close_detaches_pooled_transport(self, mock_sshclient, ssh_connection):
+        """Test that close() keeps the shared transport open for other connections"""
+        mock_client = MagicMock()
+        mock_sshclient.return_value = mock_client
+        transport = mock_client.get_transport.return_value
+
+        ssh_connection.connect()
+        ssh_connection.close()
+
+        transport.close.assert_not_called()
+        mock_client.close.assert_called_once()
+        assert ssh_connection.client is None
+
+    @patch("paramiko.SSHClient")
+    def test_close_with_drop_pool_evicts_transport(self, mock_sshclient, ssh_connection):
+        """Test that close(drop_pool=True) removes the transport from the pool"""
+        mock_sshclient.return_value = MagicMock()
+
+        ssh_connection.connect()
+        ssh_connection.close(drop_pool=True)
+
+        assert _TRANSPORT_POOL == {}
+
+    @patch("paramiko.SSHClient")
+    def test_shutdown_pool_closes_all_transports(self, mock_sshclient, ssh_connection):
+        """Test that shutdown_pool() closes and forgets every pooled transport"""
+        mock_client = MagicMock()
+        mock_sshclient.return_value = mock_client
+
+        ssh_connection.connect()
+        SSHConnection.shutdown_pool()
+
+        mock_client.get_transport.return_value.close.assert_called_once()
+        assert _TRANSPORT_POOL == {}
+
+    @patch("paramiko.SSHClient")
+    def test_ensure_connected_keeps_active_session(self, mock_sshclient, ssh_connection):
+        """Test that ensure_connected() is a no-op while the transport is up"""
+        mock_client = MagicMock()
+        mock_sshclient.return_value = mock_client
+        mock_client.get_transport.return_value.is_active.return_value = True
+
+        ssh_connection.connect()
+        ssh_connection.ensure_connected()
+
+        mock_client.connect.assert_called_once()
+        assert ssh_connection.client is mock_client
+
+    @patch("paramiko.SSHClient")
+    def test_ensure_connected_replaces_dropped_session(self, mock_sshclient, ssh_connection):
+        """Test that ensure_connected() reconnects once the transport has died"""
+        first_client, second_client = MagicMock(), MagicMock()
+        mock_sshclient.side_effect = [first_client, second_client]
+
+        ssh_connection.connect()
+        first_client.get_transport.return_value.is_active.return_value = False
+        ssh_connection.ensure_connected()
+
+        first_client.close.assert_called_once()
+        second_client.connect.assert_called_once()
+        assert ssh_connection.client is second_client
+
+
+    def test_concurrent_ensure_connected_reconnects_once(self, ssh_connection):
+        """Test that threads finding the same dropped transport share one reconnect"""
+        ssh_connection.client = MagicMock()
+        ssh_connection.client.get_transport.return_value.is_active.return_value = False
+        both_checked = threading.Barrier(2, timeout=5)
+        first_checks = []
+        original_is_connected = SSHConnection.is_connected
+
+        def is_connected(conn):
+            connected = original_is_connected(conn)
+            if len(first_checks) < 2:
+                first_checks.append(connected)
+                both_checked.wait()  # Both threads have seen the dead transport before either reconnects
+            return connected
+
+        def connect(conn):
+            conn.client = MagicMock()
+            conn.client.get_transport.return_value.is_active.return_value = True
+
+        with patch.object(SSHConnection, "is_connected", is_connected), \
+             patch.object(SSHConnection, "connect", autospec=True, side_effect=connect) as mock_connect:
+            threads = [threading.Thread(target=ssh_connection.ensure_connected) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert mock_connect.call_count == 1
+
+
+class TestVMConnectionSharing:
+    """Tests for VMConnection wrappers of the same VM sharing a transport but not a connection"""
+
+    @patch("paramiko.SSHClient")
+    def test_closing_one_wrapper_keeps_the_other_connected(self, mock_sshclient):
+        """Test that wrappers for the same VM share the transport, and close() on one leaves the other usable"""
+        first_client, second_client = MagicMock(), MagicMock()
+        mock_sshclient.side_effect = [first_client, second_client]
+        transport = first_client.get_transport.return_value
+        transport.is_active.return_value = True
+        second_client.get_transport.return_value = transport
+
+        first = VMConnection("test.example.com", "testuser", "/path/to/key")
+        second = VMConnection("test.example.com", "testuser", "/path/to/key")
+        first.connect()
+        second.connect()
+        first.close()
+
+        assert first.ssh is not second.ssh
+        second_client.connect.assert_not_called()
+        transport.close.assert_not_called()
+        assert second.ssh.is_connected()
+
+    def test_each_wrapper_keeps_its_own_timeout(self):
+        """Test that a later wrapper's connection_timeout isn't overridden by an earlier one for the same VM"""
+        VMConnection("test.example.com", "testuser", "/path/to/key")
+        slow = VMConnection("test.example.com", "testuser", "/path/to/key", connection_timeout=60)
+
+        assert slow.ssh.connection_timeout == 60
+
+    def test_key_path_is_expanded_for_pooling(self):
+        """Test that a ~ key path and its expanded form share one transport key"""
+        assert (SSHConnection("test.example.com", "testuser", "~/key")._pool_key()
+                == SSHConnection("test.example.com", "testuser", os.path.expanduser("~/key"))._pool_key())
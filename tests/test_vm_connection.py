@@ -1,22 +1,10 @@
-import pytest
+import threading
 from unittest.mock import patch, MagicMock
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from vm_connection import VMConnection, VMConnectionError
+from vm_connection import VMFleet, HealthCheckConfig
 
 class TestVMConnection:
     """Test suite for VMConnection wrapper class"""
     
-    @pytest.fixture
-    def vm_connection(self):
-        return VMConnection(
-            host="test.example.com",
-            user="testuser", 
-            key_path="/path/to/key",
-            port=22
-        )
-    
     def test_vm_connection_initialization(self, vm_connection):
         """Test VMConnection initializes with correct parameters"""
         assert vm_connection.ssh.host == "test.example.com"
@@ -44,7 +32,8 @@ class TestVMConnection:
         result = vm_connection.execute("test command", timeout=30, output_callback=print)
         
         assert result == 0
-        mock_execute.assert_called_once_with("test command", timeout=30, output_callback=print)
+        mock_execute.assert_called_once_with("test command", timeout=30, output_callback=print,
+                                             capture_output=False)
     
     @patch("vm_connection.detect_os_activity")
     def test_is_alive_basic_level(self, mock_detect_os, vm_connection):
@@ -67,7 +56,19 @@ class TestVMConnection:
         assert result['network_reachable'] is True
         assert result['os_signs_detected'] is True
         mock_detect_os.assert_called_once()
-    
+
+    @patch("vm_connection.check_ssh_connectivity")
+    @patch("vm_connection.detect_os_activity")
+    def test_is_alive_unknown_level_runs_basic_pipeline(self, mock_detect_os, mock_ssh_check, vm_connection):
+        """Test that a level outside the dispatch table gets the network-only checks"""
+        mock_detect_os.return_value = {'network_responsive': True, 'os_active': True}
+
+        result = vm_connection.is_alive(level='quick')
+
+        assert result['ssh_available'] is False
+        mock_detect_os.assert_called_once()
+        mock_ssh_check.assert_not_called()
+
     @patch("vm_connection.check_ssh_connectivity")
     @patch("vm_connection.detect_os_activity")
     def test_is_alive_medium_level_includes_ssh(self, mock_detect_os, mock_ssh_check, vm_connection):
@@ -92,6 +93,121 @@ class TestVMConnection:
         mock_detect_os.assert_called_once()
         mock_ssh_check.assert_called_once()
     
+    @patch("vm_connection.advanced_os_detection")
+    @patch("vm_connection.check_system_services")
+    @patch("vm_connection.check_ssh_connectivity", return_value=True)
+    @patch("vm_connection.detect_os_activity")
+    def test_is_alive_thorough_runs_ssh_checks_concurrently(self, mock_detect_os, mock_ssh_check,
+                                                            mock_system_services, mock_advanced_os, vm_connection):
+        """Test that system services and advanced OS detection overlap and fold back in order"""
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def mock_os_activity(host, port, result):
+            result['checks_passed'] = 1
+            return {'network_responsive': True, 'os_active': True}
+        
+        def mock_services(conn, result, level):
+            barrier.wait()  # Only releases while advanced detection is running too
+            result['checks_failed'] += 1
+            result['failed_checks'].append('services')
+        
+        def mock_advanced(conn, result):
+            barrier.wait()
+            result['checks_failed'] += 1
+            result['failed_checks'].append('advanced')
+        
+        mock_detect_os.side_effect = mock_os_activity
+        mock_system_services.side_effect = mock_services
+        mock_advanced_os.side_effect = mock_advanced
+        
+        result = vm_connection.is_alive(level='thorough')
+        
+        assert result['checks_failed'] == 2
+        assert result['failed_checks'] == ['services', 'advanced']
+    
+    @patch("vm_connection.check_system_services")
+    @patch("vm_connection.check_ssh_connectivity")
+    @patch("vm_connection.detect_os_activity")
+    def test_is_alive_skips_ssh_when_network_silent(self, mock_detect_os, mock_ssh_check,
+                                                    mock_system_services, vm_connection):
+        """Test is_alive returns without SSH checks when no network probe got an answer"""
+        def mock_os_activity(host, port, result):
+            result['checks_failed'] = 3
+            return {'network_responsive': False, 'os_active': False}
+        
+        mock_detect_os.side_effect = mock_os_activity
+        
+        result = vm_connection.is_alive(level='thorough')
+        
+        assert result['alive'] is False
+        assert result['confidence'] == 0.0
+        assert HealthCheckConfig.SSH_SKIPPED_MESSAGE in result['failed_checks']
+        mock_ssh_check.assert_not_called()
+        mock_system_services.assert_not_called()
+    
+    @patch("vm_connection.SSHConnection.is_connected", return_value=True)
+    @patch("vm_connection.check_ssh_connectivity")
+    @patch("vm_connection.detect_os_activity")
+    def test_is_alive_live_session_skips_network_probes(self, mock_detect_os, mock_ssh_check,
+                                                        mock_is_connected, vm_connection):
+        """Test that a working SSH session answers is_alive without any network probing"""
+        def mock_ssh_connectivity(conn, result):
+            result['checks_passed'] += 2
+            return True
+        
+        mock_ssh_check.side_effect = mock_ssh_connectivity
+        
+        result = vm_connection.is_alive(level='medium')
+        
+        assert result['alive'] is True
+        assert result['confidence'] == 1.0
+        assert result['network_reachable'] is True
+        assert result['os_signs_detected'] is True
+        mock_detect_os.assert_not_called()
+        mock_ssh_check.assert_called_once()
+    
+    @patch("vm_connection.check_ssh_connectivity", return_value=True)
+    @patch("vm_connection._batch_probe", return_value=[])
+    @patch("vm_connection._test_ping_internal", return_value=True)
+    def test_is_alive_reports_same_keys_with_or_without_probes(self, mock_ping, mock_batch, mock_ssh_check,
+                                                              vm_connection):
+        """Test that answering from a live SSH session returns the same result keys as probing the network"""
+        with patch("vm_connection.SSHConnection.is_connected", return_value=False):
+            probed = vm_connection.is_alive(level='medium')
+        with patch("vm_connection.SSHConnection.is_connected", return_value=True):
+            unprobed = vm_connection.is_alive(level='medium')
+
+        assert mock_batch.call_count == 1
+        assert unprobed.keys() == probed.keys()
+        assert unprobed['port_behavior'] == 'skipped'
+        assert unprobed['response_pattern'] == 'ssh'
+
+    @patch("vm_connection.SSHConnection.is_connected", return_value=True)
+    @patch("vm_connection.check_ssh_connectivity")
+    @patch("vm_connection.detect_os_activity")
+    def test_is_alive_probes_network_when_live_session_fails(self, mock_detect_os, mock_ssh_check,
+                                                             mock_is_connected, vm_connection):
+        """Test that a failed SSH check on a live session falls back to the network probes, checking SSH once"""
+        def mock_os_activity(host, port, result):
+            result['checks_failed'] += 3
+            return {'network_responsive': False, 'os_active': False}
+        
+        def mock_ssh_connectivity(conn, result):
+            result['checks_failed'] += 1
+            return False
+        
+        mock_detect_os.side_effect = mock_os_activity
+        mock_ssh_check.side_effect = mock_ssh_connectivity
+        
+        result = vm_connection.is_alive(level='medium')
+        
+        assert result['alive'] is False
+        assert result['ssh_available'] is False
+        assert result['checks_failed'] == 4
+        assert HealthCheckConfig.SSH_SKIPPED_MESSAGE not in result['failed_checks']
+        mock_detect_os.assert_called_once()
+        mock_ssh_check.assert_called_once()
+    
     @patch("vm_connection.advanced_os_detection")
     @patch("vm_connection.check_system_services")
     @patch("vm_connection.check_ssh_connectivity")
@@ -167,4 +283,40 @@ class TestVMConnection:
         assert result['alive'] is False
         assert result['confidence'] == 0.0
         assert result['network_reachable'] is False
-        assert result['os_signs_detected'] is False
\ No newline at end of file
+        assert result['os_signs_detected'] is False
+
+    @patch("vm_connection.detect_os_activity")
+    def test_is_alive_decision_follows_configured_evidence(self, mock_detect_os, vm_connection):
+        """Test that the alive decision uses the evidence thresholds from HealthCheckConfig"""
+        def mock_os_activity(host, port, result):
+            result['checks_passed'] = 2
+            result['checks_failed'] = 1
+            return {'network_responsive': True, 'os_active': True}
+        
+        mock_detect_os.side_effect = mock_os_activity
+        
+        with patch.object(HealthCheckConfig, 'ALIVE_EVIDENCE', (('os_signs_detected', 0.9),)):
+            result = vm_connection.is_alive(level='basic')
+        
+        assert result['confidence'] == 2/3
+        assert result['alive'] is False
+
+class TestVMFleet:
+    """Test suite for fleet-wide health checks"""
+    
+    def test_is_alive_all_checks_vms_concurrently(self):
+        """Test that every VM is checked at the same time and results keep VM order"""
+        barrier = threading.Barrier(3, timeout=5)
+        vms = [MagicMock() for _ in range(3)]
+        for index, vm in enumerate(vms):
+            vm.is_alive.side_effect = lambda level, index=index: (barrier.wait(), {'alive': index != 1})[1]
+        
+        results = VMFleet(vms).is_alive_all(level='basic')
+        
+        assert [r['alive'] for r in results] == [True, False, True]
+        for vm in vms:
+            vm.is_alive.assert_called_once_with(level='basic')
+    
+    def test_is_alive_all_with_no_vms(self):
+        """Test that an empty fleet returns no results"""
+        assert VMFleet([]).is_alive_all() == []
@@ -11,19 +11,43 @@ Example:
     exit_code = conn.execute("uptime", timeout=30, output_callback=print)
 """
 import os
-import paramiko
-import paramiko.buffered_pipe
+import errno
+import struct
+import re
+import functools
+import itertools
 import time
-import select
+import random
+import selectors
 import logging
 import subprocess
 import socket
 import platform
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# paramiko pulls in cryptography, which is slow to import; load it on first use
+paramiko = None
+
+
+def _paramiko():
+    global paramiko
+    if paramiko is None:
+        import paramiko as paramiko_module
+        paramiko = paramiko_module
+    return paramiko
+
+
+# Kernel boot IDs are random UUIDs
+_BOOT_ID_RE = re.compile(rb'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+# The same pattern for output that was already decoded
+_BOOT_ID_TEXT_RE = re.compile(_BOOT_ID_RE.pattern.decode())
+
 
 # ============================================================================
 # EXCEPTIONS
@@ -58,18 +82,49 @@ class HealthCheckConfig:
     DEFAULT_PING_COUNT = 3
     DEFAULT_PING_TIMEOUT = 1
     DEFAULT_PING_PROCESS_TIMEOUT = 8
+    PING_FALLBACK_PORT = 22
+    # Set this environment variable to ping through the system `ping` binary instead
+    SUBPROCESS_PING_ENV = 'VM_CONNECTION_SUBPROCESS_PING'
     
     DEFAULT_SOCKET_TIMEOUT = 2.0
     QUICK_RESPONSE_THRESHOLD = 0.5
+    QUICK_RESPONSE_THRESHOLD_NS = int(QUICK_RESPONSE_THRESHOLD * 1_000_000_000)
     MIN_QUICK_REJECTIONS = 2
     
     DEFAULT_TCP_TESTS = 3
     MIN_QUICK_TCP_RESPONSES = 2
     
     DEFAULT_TEST_PORTS = [22, 80, 443]
+    MAX_PROBE_WORKERS = 16
+
+    SERVICE_CHECK_TIMEOUT = 5
+    OS_DETECTION_TIMEOUT = 3
+    # Printed after each command of a batched health check, followed by its exit status
+    BATCH_RC_MARKER = '===VMC_RC==='
     
+    # Reported in failed_checks when nothing answered on the network, so SSH wasn't attempted
+    SSH_SKIPPED_MESSAGE = 'SSH checks skipped - no network response'
+
     ALIVE_CONFIDENCE_THRESHOLD = 0.6
     SSH_CONFIDENCE_THRESHOLD = 0.7
+    # (evidence flag, confidence it must exceed): VMConnection.is_alive() reports alive if any pair holds
+    ALIVE_EVIDENCE = (
+        ('os_signs_detected', ALIVE_CONFIDENCE_THRESHOLD),
+        ('ssh_available', SSH_CONFIDENCE_THRESHOLD),
+    )
+
+def _new_check_result():
+    """Empty tally for a check that runs alongside others and is folded back afterwards."""
+    return {'checks_passed': 0, 'checks_failed': 0, 'failed_checks': []}
+
+
+def _fold_results(result, partials):
+    """Add the tallies of checks that ran concurrently into result, in the order given."""
+    for partial in partials:
+        result['checks_passed'] += partial['checks_passed']
+        result['checks_failed'] += partial['checks_failed']
+        result['failed_checks'].extend(partial['failed_checks'])
+
 
 def detect_os_activity(host, port, result):
     """
@@ -89,7 +144,8 @@ def detect_os_activity(host, port, result):
             - network_responsive (bool): Whether any positive signal was detected.
             - os_active (bool): Whether the VM OS is likely still running.
             - ping_responsive (bool): ICMP ping success.
-            - port_behavior (str): One of "quick_rejection", "mixed_response", "all_timeout", "unknown".
+            - port_behavior (str): One of "quick_rejection", "mixed_response", "all_timeout", "unknown"
+              ("skipped" in VMConnection.is_alive() results when SSH answered first).
             - tcp_stack_active (bool): Whether TCP stack appeared responsive.
             - response_pattern (str): Additional details, e.g., "normal", "timeout".
     """
@@ -102,14 +158,25 @@ def detect_os_activity(host, port, result):
         'response_pattern': 'timeout'
     }
 
-    # Tier 1: ICMP ping
-    ping_success = _test_ping_internal(host, result, detection_result)
-
+    # Tiers 2 and 3 both time TCP connects, so one fan-out of probes serves them both;
+    # it runs alongside the ping. Each tier tallies into its own result dict (folded
+    # back in tier order below); they write disjoint keys of detection_result.
+    tier_results = [_new_check_result() for _ in range(3)]
+    probe_ports = _behavior_ports(port) + [port] * (HealthCheckConfig.DEFAULT_TCP_TESTS - 1)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Tier 1: ICMP ping
+        ping_future = executor.submit(_test_ping_internal, host, tier_results[0], detection_result, port=port)
+        probe_future = executor.submit(_batch_probe, host, probe_ports, HealthCheckConfig.DEFAULT_SOCKET_TIMEOUT,
+                                       settled=functools.partial(_probe_tiers_settled, port))
+    ping_success = ping_future.result()
+    measurements = probe_future.result()
     # Tier 2: TCP port behavior
-    port_analysis = analyze_port_behavior(host, port, result, detection_result)
-
+    port_analysis = analyze_port_behavior(host, port, tier_results[1], detection_result, measurements=measurements)
     # Tier 3: TCP stack responsiveness
-    tcp_stack_active = _test_tcp_stack_internal(host, port, result, detection_result)
+    tcp_stack_active = _test_tcp_stack_internal(host, port, tier_results[2], detection_result,
+                                                measurements=measurements)
+
+    _fold_results(result, tier_results)
 
     # Aggregate evidence
     os_indicators = 0
@@ -126,22 +193,102 @@ def detect_os_activity(host, port, result):
     return detection_result
 
 
-def _test_ping_internal(host, result, detection_result):
-    """Test basic ICMP connectivity."""
+# ping arguments for each platform, less the host
+_PING_CMD_WINDOWS = ('ping', '-n', str(HealthCheckConfig.DEFAULT_PING_COUNT),
+                     '-w', str(HealthCheckConfig.DEFAULT_PING_TIMEOUT * 1000))
+_PING_CMD_POSIX = ('ping', '-c', str(HealthCheckConfig.DEFAULT_PING_COUNT),
+                   '-W', str(HealthCheckConfig.DEFAULT_PING_TIMEOUT))
+
+
+@functools.lru_cache(maxsize=1)
+def _ping_is_windows():
+    """Whether ping takes Windows-style flags; the platform never changes within a process."""
+    return platform.system().lower().startswith('win')
+
+
+def _icmp_checksum(data):
+    """RFC 1071 internet checksum."""
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+# Sequence numbers for ICMP echo requests, unique across threads
+_ICMP_SEQUENCE = itertools.count(1)
+
+
+def _icmp_ping(host, timeout, fallback_port=None):
+    """
+    Send one ICMP echo request over an unprivileged datagram socket.
+    Where the OS refuses such a socket, fall back to a TCP connect on
+    fallback_port (default PING_FALLBACK_PORT); a refused connection still proves the host is up.
+    Returns:
+        tuple: (ok, rtt) where rtt is the round trip in seconds, or None without a reply.
+    """
     try:
-        if platform.system().lower().startswith('win'):
-            cmd = ['ping', '-n', str(HealthCheckConfig.DEFAULT_PING_COUNT), '-w', str(HealthCheckConfig.DEFAULT_PING_TIMEOUT * 1000), host]
-        else:
-            cmd = ['ping', '-c', str(HealthCheckConfig.DEFAULT_PING_COUNT), '-W', str(HealthCheckConfig.DEFAULT_PING_TIMEOUT), host]
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    except OSError:
+        code, elapsed_ns = _probe_port(host, fallback_port or HealthCheckConfig.PING_FALLBACK_PORT, timeout)
+        if code in (0, errno.ECONNREFUSED):
+            return True, elapsed_ns / 1_000_000_000
+        return False, None
 
-        ping_result = subprocess.run(cmd, capture_output=True, timeout=HealthCheckConfig.DEFAULT_PING_PROCESS_TIMEOUT, text=True)
+    try:
+        address = socket.gethostbyname(host)
+        ident = os.getpid() & 0xffff
+        # Threads of one process share ident, so the sequence number tells their echoes apart
+        sequence = next(_ICMP_SEQUENCE) & 0xffff
+        payload = b'vm_connection'
+        checksum = _icmp_checksum(struct.pack('!BBHHH', 8, 0, 0, ident, sequence) + payload)
+        # perf_counter: monotonic too, but fine-grained enough for sub-millisecond RTTs on every platform
+        start = time.perf_counter()
+        deadline = start + timeout
+        sock.sendto(struct.pack('!BBHHH', 8, 0, checksum, ident, sequence) + payload, (address, 0))
+        # Linux swaps the identifier for the socket's port; other platforms send it as is
+        idents = {ident, sock.getsockname()[1]}
+        while True:
+            # Unrelated ICMP traffic must not stretch the wait past timeout
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False, None
+            sock.settimeout(remaining)
+            reply, (source, _) = sock.recvfrom(1024)
+            # Linux strips the IP header from ping sockets, macOS does not
+            if reply and reply[0] >> 4 == 4:
+                reply = reply[(reply[0] & 0x0f) * 4:]
+            if source != address or len(reply) < 8:
+                continue
+            kind, _, _, reply_ident, reply_sequence = struct.unpack('!BBHHH', reply[:8])
+            if kind == 0 and reply_ident in idents and reply_sequence == sequence:  # our echo reply
+                return True, time.perf_counter() - start
+    except socket.timeout:
+        return False, None
+    finally:
+        sock.close()
+
+
+def _test_ping_internal(host, result, detection_result, port=None):
+    """Test basic ICMP connectivity, handshaking with the VM's SSH port where ICMP sockets aren't allowed."""
+    try:
+        if os.environ.get(HealthCheckConfig.SUBPROCESS_PING_ENV):
+            cmd = [*(_PING_CMD_WINDOWS if _ping_is_windows() else _PING_CMD_POSIX), host]
 
-        if ping_result.returncode == 0:
+            ping_result = subprocess.run(cmd, capture_output=True, timeout=HealthCheckConfig.DEFAULT_PING_PROCESS_TIMEOUT, text=True)
+            responded = ping_result.returncode == 0
+            normal = 'ttl=' in ping_result.stdout.lower()
+        else:
+            # Stop at the first reply, like ping's exit status does
+            responded = any(_icmp_ping(host, HealthCheckConfig.DEFAULT_PING_TIMEOUT, port)[0]
+                            for _ in range(HealthCheckConfig.DEFAULT_PING_COUNT))
+            normal = responded
+
+        if responded:
             result['checks_passed'] += 1
             detection_result['ping_responsive'] = True
-
-            output = ping_result.stdout.lower()
-            if 'ttl=' in output:
+            if normal:
                 detection_result['response_pattern'] = 'normal'
             return True
         else:
@@ -154,29 +301,103 @@ def _test_ping_internal(host, result, detection_result):
         return False
 
 
-def analyze_port_behavior(host, port, result, detection_result):
-    """Check how the VM responds to TCP connection attempts."""
+_LINGER_RESET = struct.pack('ii', 1, 0)
+
+
+def _probe_port(host, port, timeout):
+    """Attempt one TCP connection, returning (connect_ex code, elapsed nanoseconds)."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        # Reset on close rather than FIN, so probes that connect don't pile up in TIME_WAIT
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+        sock.settimeout(timeout)
+        start_ns = time.perf_counter_ns()
+        code = sock.connect_ex((host, port))
+        return code, time.perf_counter_ns() - start_ns
+    finally:
+        sock.close()
+
+
+def _batch_probe(host, ports, timeout, settled=None):
+    """Probe every entry of ports (repeats allowed) in one concurrent pass.
+    Returns (port, code, elapsed_ns) for each probe that completed, in completion order; probes that raised are left out.
+    When settled(measurements) turns true the pass stops there and the outstanding probes are abandoned."""
+    executor = ThreadPoolExecutor(max_workers=min(len(ports), HealthCheckConfig.MAX_PROBE_WORKERS))
+    measurements = []
+    try:
+        futures = {executor.submit(_probe_port, host, p, timeout): p for p in ports}
+        for future in as_completed(futures):
+            try:
+                measurements.append((futures[future], *future.result()))
+            except Exception:
+                continue
+            if settled is not None and settled(measurements):
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return measurements
+
+
+def _first_per_port(measurements):
+    """(code, elapsed_ns) of each port's first measurement, keyed by port."""
+    first = {}
+    for p, code, elapsed_ns in measurements:
+        first.setdefault(p, (code, elapsed_ns))
+    return first
+
+
+def _quick_rejection_count(probes):
+    """How many (code, elapsed_ns) probes were refused within QUICK_RESPONSE_THRESHOLD."""
+    threshold = HealthCheckConfig.QUICK_RESPONSE_THRESHOLD_NS
+    return sum(1 for code, elapsed_ns in probes if code != 0 and elapsed_ns < threshold)
+
+
+def _quick_response_count(measurements, port):
+    """How many measurements of port got any answer within QUICK_RESPONSE_THRESHOLD."""
+    threshold = HealthCheckConfig.QUICK_RESPONSE_THRESHOLD_NS
+    return sum(1 for p, _, elapsed_ns in measurements if p == port and elapsed_ns < threshold)
+
+
+def _port_behavior_settled(measurements):
+    """Whether enough ports already rejected quickly that the slower ones can't change the verdict."""
+    return _quick_rejection_count(_first_per_port(measurements).values()) >= HealthCheckConfig.MIN_QUICK_REJECTIONS
+
+
+def _tcp_stack_settled(port, measurements):
+    """Whether port already answered quickly often enough to count the TCP stack as active."""
+    return _quick_response_count(measurements, port) >= HealthCheckConfig.MIN_QUICK_TCP_RESPONSES
+
+
+def _probe_tiers_settled(port, measurements):
+    """Whether measurements already prove both quick port rejection and an active TCP stack on port,
+    so waiting on the slower probes could not change either tier's verdict."""
+    return _port_behavior_settled(measurements) and _tcp_stack_settled(port, measurements)
+
+
+def _behavior_ports(port):
+    """Ports probed for port behavior, the SSH port first."""
+    # The SSH port is usually 22 already; probing it twice would also count its rejection twice
+    return list(dict.fromkeys([port] + HealthCheckConfig.DEFAULT_TEST_PORTS))
+
+
+def analyze_port_behavior(host, port, result, detection_result, measurements=None):
+    """Check how the VM responds to TCP connection attempts.
+    Pass measurements from _batch_probe() to reuse them instead of probing again."""
     port_analysis = {'quick_rejection': False, 'any_response': False}
-    test_ports = [port] + HealthCheckConfig.DEFAULT_TEST_PORTS
+    test_ports = _behavior_ports(port)
 
-    quick_rejections = 0
-    for p in test_ports:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(HealthCheckConfig.DEFAULT_SOCKET_TIMEOUT)
-            start_time = time.time()
-            res = sock.connect_ex((host, p))
-            elapsed = time.time() - start_time
-            if res == 0:
-                port_analysis['any_response'] = True
-            elif elapsed < HealthCheckConfig.QUICK_RESPONSE_THRESHOLD:
-                quick_rejections += 1
-                port_analysis['any_response'] = True
-            sock.close()
-        except Exception:
-            continue
+    if measurements is None:
+        # Enough quick rejections settle it; no need to wait on the slower ports
+        measurements = _batch_probe(host, test_ports, HealthCheckConfig.DEFAULT_SOCKET_TIMEOUT,
+                                    settled=_port_behavior_settled)
 
-    if quick_rejections >= HealthCheckConfig.MIN_QUICK_REJECTIONS:
+    # Only the first measurement of each port counts, as if each were probed once
+    first = _first_per_port(measurements)
+    probes = [first[p] for p in test_ports if p in first]
+    threshold = HealthCheckConfig.QUICK_RESPONSE_THRESHOLD_NS
+    port_analysis['any_response'] = any(code == 0 or elapsed_ns < threshold for code, elapsed_ns in probes)
+
+    if _quick_rejection_count(probes) >= HealthCheckConfig.MIN_QUICK_REJECTIONS:
         port_analysis['quick_rejection'] = True
         detection_result['port_behavior'] = 'quick_rejection'
         result['checks_passed'] += 1
@@ -191,22 +412,15 @@ def analyze_port_behavior(host, port, result, detection_result):
     return port_analysis
 
 
-def _test_tcp_stack_internal(host, port, result, detection_result):
-    """Test TCP stack responsiveness."""
+def _test_tcp_stack_internal(host, port, result, detection_result, measurements=None):
+    """Test TCP stack responsiveness.
+    Pass measurements from _batch_probe() to reuse them instead of probing again."""
     try:
-        responses = []
-        for _ in range(HealthCheckConfig.DEFAULT_TCP_TESTS):
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(HealthCheckConfig.DEFAULT_PING_TIMEOUT)
-            try:
-                start = time.time()
-                code = sock.connect_ex((host, port))
-                elapsed = time.time() - start
-                responses.append((code, elapsed))
-            finally:
-                sock.close()
-        quick_responses = sum(1 for _, t in responses if t < HealthCheckConfig.QUICK_RESPONSE_THRESHOLD)
-        if quick_responses >= HealthCheckConfig.MIN_QUICK_TCP_RESPONSES:
+        if measurements is None:
+            measurements = _batch_probe(host, [port] * HealthCheckConfig.DEFAULT_TCP_TESTS,
+                                        HealthCheckConfig.DEFAULT_PING_TIMEOUT,
+                                        settled=functools.partial(_tcp_stack_settled, port))
+        if _tcp_stack_settled(port, measurements):
             detection_result['tcp_stack_active'] = True
             result['checks_passed'] += 1
             return True
@@ -229,19 +443,14 @@ def check_ssh_connectivity(conn, result):
     Returns True if SSH is working, False otherwise.
     """
     try:
-        # Check if existing connection is active
-        transport = conn.client.get_transport() if conn.client else None
-        if transport and transport.is_active():
+        # Reuse the existing connection if active, reconnect otherwise
+        try:
+            conn.ensure_connected()
             result['checks_passed'] += 1
-        else:
-            # Try to reconnect
-            try:
-                conn.connect()
-                result['checks_passed'] += 1
-            except Exception as e:
-                result['failed_checks'].append(f'SSH connection failed: {str(e)}')
-                result['checks_failed'] += 1
-                return False
+        except Exception as e:
+            result['failed_checks'].append(f'SSH connection failed: {str(e)}')
+            result['checks_failed'] += 1
+            return False
 
         # Test simple command execution
         try:
@@ -264,68 +473,177 @@ def check_ssh_connectivity(conn, result):
         return False
 
 
+def _batch_commands(commands):
+    """Join commands into one shell line that prints each one's exit status after its output."""
+    marker = HealthCheckConfig.BATCH_RC_MARKER
+    return '; '.join(f"{command}; printf '\\n{marker}%d\\n' $?" for command in commands)
+
+
+def _split_batched_output(output, count):
+    """
+    Split the stdout of a _batch_commands() line back into per-command results.
+    Returns:
+        list: `count` (exit_code, output) tuples; exit_code is None for commands
+        that never reported (e.g. the shell died part way through).
+    """
+    marker = HealthCheckConfig.BATCH_RC_MARKER
+    sections = []
+    lines = []
+    for line in output.split('\n'):
+        if line.startswith(marker) and line[len(marker):].isdigit():
+            # The newline printf puts ahead of the marker ends the command's last line
+            sections.append((int(line[len(marker):]), '\n'.join(lines)))
+            lines = []
+        else:
+            lines.append(line)
+    sections.extend((None, '') for _ in range(count - len(sections)))
+    return sections[:count]
+
+
+# (command, description) pairs for the SSH-side checks, fixed per level
+_SERVICES_MEDIUM = (
+    ('uptime', 'System uptime check'),
+    ('df -h /', 'Disk space check'),
+    ('ps aux | head -5', 'Process list check'),
+)
+_SERVICES_THOROUGH = _SERVICES_MEDIUM + (
+    ('free -m', 'Memory usage check'),
+    ('who', 'User session check'),
+    ('systemctl is-system-running 2>/dev/null || echo "unknown"', 'System state check'),
+)
+_OS_INDICATORS = (
+    ('cat /proc/version 2>/dev/null | head -1', 'Linux kernel check'),
+    ('uname -a', 'System info check'),
+    ('cat /etc/os-release 2>/dev/null | head -3', 'OS release check'),
+)
+
+
+def _system_service_checks(level):
+    """(command, description) pairs the system service check runs at this level."""
+    return _SERVICES_THOROUGH if level == 'thorough' else _SERVICES_MEDIUM
+
+
+def _tally_service_checks(result, services_to_check, sections):
+    """Count each service check as passed or failed from its batched (exit_code, output) section."""
+    for (_, description), (exit_code, _) in zip(services_to_check, sections):
+        if exit_code == 0:
+            result['checks_passed'] += 1
+        else:
+            result['failed_checks'].append(f'{description} failed')
+            result['checks_failed'] += 1
+
+
 def check_system_services(conn, result, level='medium'):
     """
     Check system-level services and health indicators via SSH.
+    All checks run as one batched command, so a check costs a single round trip.
     This can be extended to check disk, memory, processes, uptime, etc.
     """
     if not conn.client:
         return
 
-    services_to_check = [
-        ('uptime', 'System uptime check'),
-        ('df -h /', 'Disk space check'),
-        ('ps aux | head -5', 'Process list check')
-    ]
-
-    if level == 'thorough':
-        services_to_check.extend([
-            ('free -m', 'Memory usage check'),
-            ('who', 'User session check'),
-            ('systemctl is-system-running 2>/dev/null || echo "unknown"', 'System state check')
-        ])
-
-    for command, description in services_to_check:
-        try:
-            exit_code = conn.execute(command, timeout=5)
-            if exit_code == 0:
-                result['checks_passed'] += 1
-            else:
-                result['failed_checks'].append(f'{description} failed')
-                result['checks_failed'] += 1
-        except Exception as e:
+    services_to_check = _system_service_checks(level)
+    try:
+        _, stdout, _ = conn.execute(_batch_commands(command for command, _ in services_to_check),
+                                    timeout=HealthCheckConfig.SERVICE_CHECK_TIMEOUT * len(services_to_check),
+                                    capture_output=True)
+    except Exception as e:
+        for _, description in services_to_check:
             result['failed_checks'].append(f'{description} error: {str(e)}')
             result['checks_failed'] += 1
+        return
+
+    _tally_service_checks(result, services_to_check, _split_batched_output(stdout, len(services_to_check)))
 
 
 def advanced_os_detection(conn, result):
     """
     Advanced OS detection using SSH to read kernel, OS release, and system info.
+    The three reads go out as one batched command.
     """
     if not conn.client:
         return
 
-    os_indicators = [
-        ('cat /proc/version 2>/dev/null | head -1', 'Linux kernel check'),
-        ('uname -a', 'System info check'),
-        ('cat /etc/os-release 2>/dev/null | head -3', 'OS release check')
-    ]
+    try:
+        _, stdout, _ = conn.execute(_batch_commands(command for command, _ in _OS_INDICATORS),
+                                    timeout=HealthCheckConfig.OS_DETECTION_TIMEOUT * len(_OS_INDICATORS),
+                                    capture_output=True)
+    except Exception:
+        result['checks_failed'] += len(_OS_INDICATORS)
+        return
 
-    for command, description in os_indicators:
-        try:
-            exit_code = conn.execute(command, timeout=3)
-            if exit_code == 0:
-                result['checks_passed'] += 1
-            else:
-                result['checks_failed'] += 1
-        except Exception:
+    for exit_code, _ in _split_batched_output(stdout, len(_OS_INDICATORS)):
+        if exit_code == 0:
+            result['checks_passed'] += 1
+        else:
             result['checks_failed'] += 1
 
 
+# ============================================================================
+# TRANSPORT POOL
+# ============================================================================
+
+# Live transports shared by every SSHConnection with the same
+# (host, port, user, key_path), in the spirit of OpenSSH's ControlMaster.
+# Least recently used first; past _TRANSPORT_POOL_SIZE the oldest is closed.
+_TRANSPORT_POOL = OrderedDict()
+_TRANSPORT_POOL_SIZE = 128
+_TRANSPORT_POOL_LOCK = threading.Lock()
+
+
+def _pool_transport(pool_key, transport):
+    """Pool transport under pool_key, closing the least recently used ones beyond _TRANSPORT_POOL_SIZE.
+    A connection still on an evicted transport reconnects through ensure_connected() on its next command."""
+    with _TRANSPORT_POOL_LOCK:
+        _TRANSPORT_POOL[pool_key] = transport
+        _TRANSPORT_POOL.move_to_end(pool_key)
+        evicted = []
+        while len(_TRANSPORT_POOL) > _TRANSPORT_POOL_SIZE:
+            evicted.append(_TRANSPORT_POOL.popitem(last=False)[1])
+    for old_transport in evicted:
+        old_transport.close()
+
+
+@functools.lru_cache(maxsize=32)
+def _load_pkey(path, mtime):
+    """Parse a private key file once; mtime is part of the cache key so a rotated key is re-read.
+    Returns None when the key can't be parsed here (e.g. it is encrypted) so paramiko can report why."""
+    ssh = _paramiko()
+    for key_class in (ssh.Ed25519Key, ssh.ECDSAKey, ssh.RSAKey):
+        try:
+            return key_class.from_private_key_file(path)
+        except (ssh.SSHException, ValueError):
+            continue
+    return None
+
+
+def _cached_pkey(path):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    return _load_pkey(path, mtime)
+
+
 # ============================================================================
 # SSH CONNECTION CLASS
 # ============================================================================
 
+# Exit status line printed after each command run on the long-lived shell
+_SHELL_RC_RE = re.compile(rb'\n' + re.escape(HealthCheckConfig.BATCH_RC_MARKER.encode()) + rb'(\d+)\n')
+
+
+def _emit_lines(buffer, output_callback, prefix=''):
+    """Pass each complete line in buffer to output_callback, leaving the trailing partial line in place."""
+    if b'\n' not in buffer:
+        return
+    *lines, tail = buffer.split(b'\n')
+    buffer[:] = tail
+    if output_callback:
+        for line in lines:
+            output_callback(f"{prefix}{line.decode(errors='replace').strip()}")
+
+
 class SSHConnection:
     """
     Represents a resilient SSH connection to a remote Linux VM.
@@ -338,119 +656,375 @@ class SSHConnection:
         user (str): SSH username.
         key_path (str): Path to the SSH private key.
         port (int, optional): SSH port (default: 22).
+        is_alive_ttl (float, optional): Seconds an is_alive() verdict is reused for (default: 0, no caching).
     """
-    def __init__(self, host: str, user: str, key_path: str, port: int = 22, connection_timeout: int = 10):
+    __slots__ = ('host', 'user', 'key_path', 'port', 'connection_timeout', 'client', 'last_boot_id', '_shell',
+                 '_observed_boot_id', 'is_alive_ttl', '_is_alive_cache', '_reconnect_lock')
+
+    KEEPALIVE_INTERVAL = 30
+    TCP_KEEPALIVE_IDLE = 30
+    TCP_KEEPALIVE_INTERVAL = 10
+    TCP_KEEPALIVE_PROBES = 3
+    SELECT_POLL_INTERVAL = 1.0
+    RECV_CHUNK_SIZE = 65536
+    # How long a boot ID read by fetch_host_state() can stand in for a fresh read in check_reboot()
+    BOOT_ID_MAX_AGE = 5
+    # A boot ID is a 36 byte UUID plus newline; anything much longer isn't one
+    BOOT_ID_READ_SIZE = 64
+    BOOT_ID_COMMAND = 'cat /proc/sys/kernel/random/boot_id'
+
+    def __init__(self, host: str, user: str, key_path: str, port: int = 22, connection_timeout: int = 10,
+                 is_alive_ttl: float = 0.0):
         self.host = host
         self.user = user
-        self.key_path = key_path
+        # Expanded once here; connect() and the pool key use the resolved path
+        self.key_path = os.path.expanduser(key_path) if key_path else key_path
         self.port = port
         self.connection_timeout = connection_timeout
         self.client = None
         self.last_boot_id = None
+        self._shell = None
+        self._observed_boot_id = None
+        self.is_alive_ttl = is_alive_ttl
+        self._is_alive_cache = {}
+        self._reconnect_lock = threading.Lock()
 
     def connect(self):
-        """Open a SSH connection using the stored parameters"""
+        """Open a SSH connection, reusing a pooled transport to the same VM when one is still active"""
         try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            if self.key_path:
+            client = _paramiko().SSHClient()
+            client.set_missing_host_key_policy(_paramiko().AutoAddPolicy())
+            if not self.key_path:
+                raise ValueError("Key_path is required for connecting to the vm using key-based authenticating")
+
+            pool_key = self._pool_key()
+            with _TRANSPORT_POOL_LOCK:
+                transport = _TRANSPORT_POOL.get(pool_key)
+                if transport is not None and not transport.is_active():
+                    del _TRANSPORT_POOL[pool_key]
+                    transport = None
+                elif transport is not None:
+                    _TRANSPORT_POOL.move_to_end(pool_key)
+
+            if transport is not None:
+                client._transport = transport
+            else:
+                pkey = _cached_pkey(self.key_path)
                 client.connect(
                     hostname=self.host,
                     username=self.user,
                     port=self.port,
-                    key_filename=os.path.expanduser(self.key_path),
+                    pkey=pkey,
+                    key_filename=None if pkey else self.key_path,
                     timeout=self.connection_timeout
                 )
-            else:
-                raise ValueError("Key_path is required for connecting to the vm using key-based authenticating")
+                transport = client.get_transport()
+                self._tune_transport(transport)
+                _pool_transport(pool_key, transport)
             self.client = client
-        except paramiko.AuthenticationException as e:
+        except _paramiko().AuthenticationException as e:
             raise AuthenticationError("SSH authentication failed") from e
-        except (paramiko.SSHException, OSError) as e:
+        except (_paramiko().SSHException, OSError) as e:
             raise VMConnectionError(f"failed to connect to the VM at {self.host}:{self.port}", e) from e
 
-    def close(self):
+    def close(self, drop_pool=False):
+        """Close the SSH client. A pooled transport is left open for reuse unless drop_pool is set."""
+        if self._shell is not None:
+            self._shell.close()
+            self._shell = None
         if self.client:
+            transport = self.client.get_transport()
+            with _TRANSPORT_POOL_LOCK:
+                pool_key = self._pool_key()
+                if transport is not None and _TRANSPORT_POOL.get(pool_key) is transport:
+                    if drop_pool:
+                        del _TRANSPORT_POOL[pool_key]
+                    else:
+                        # Detach so SSHClient.close() doesn't tear down the shared transport
+                        self.client._transport = None
             self.client.close()
             self.client = None
 
-    def execute(self, command, timeout=None, output_callback=None):
+    def is_connected(self):
+        """Whether the client holds an active transport, i.e. commands can run without a handshake"""
+        transport = self.client.get_transport() if self.client else None
+        return transport is not None and transport.is_active()
+
+    def ensure_connected(self):
+        """Connect unless the current transport is still active, so callers reuse a live session.
+        Threads sharing this connection reconnect once; the others wait and then find the new session."""
+        if self.is_connected():
+            return
+        with self._reconnect_lock:
+            if self.is_connected():
+                return
+            self.close(drop_pool=True)
+            self.connect()
+
+    @staticmethod
+    def shutdown_pool():
+        """Close every pooled transport."""
+        with _TRANSPORT_POOL_LOCK:
+            transports = list(_TRANSPORT_POOL.values())
+            _TRANSPORT_POOL.clear()
+        for transport in transports:
+            transport.close()
+
+    def _tune_transport(self, transport):
+        """Disable Nagle and enable keepalives so small SSH packets aren't delayed and a dead
+        peer is noticed by the kernel within about a minute instead of on the next write"""
+        sock = transport.sock
+        if hasattr(sock, 'setsockopt'):
+            options = [
+                (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+            # The kernel default waits two hours before the first probe; not every platform lets us change it
+            for name, value in (('TCP_KEEPIDLE', self.TCP_KEEPALIVE_IDLE),
+                                ('TCP_KEEPINTVL', self.TCP_KEEPALIVE_INTERVAL),
+                                ('TCP_KEEPCNT', self.TCP_KEEPALIVE_PROBES)):
+                if hasattr(socket, name):
+                    options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+            for level, option, value in options:
+                try:
+                    sock.setsockopt(level, option, value)
+                except OSError as e:
+                    # e.g. a proxy channel standing in for the socket; tuning is best effort
+                    logger.debug("Could not set socket option %s: %s", option, e)
+        transport.set_keepalive(self.KEEPALIVE_INTERVAL)
+
+    def _pool_key(self):
+        # key_path was expanded in __init__
+        return (self.host, self.port, self.user, self.key_path)
+
+    def execute(self, command, timeout=None, output_callback=None, capture_output=False):
+        """Run a command, streaming output lines to output_callback as they arrive.
+
+        Returns the exit code, or (exit_code, stdout, stderr) when capture_output is set.
+        Output nobody asked for is read and discarded so memory stays flat.
+        """
         if not self.client:
             raise VMConnectionError("Not connected to VM")
+        # Transparently replace a transport that dropped since the last command
+        self.ensure_connected()
 
-        start_time = time.time()
-        _, stdout, stderr = self.client.exec_command(command)
+        deadline = time.monotonic() + timeout if timeout else None
+        _, stdout, _ = self.client.exec_command(command)
+        channel = stdout.channel
 
-        # Make channels non-blocking
-        stdout.channel.setblocking(0)
-        stderr.channel.setblocking(0)
+        # Make channel non-blocking (stdout and stderr share it)
+        channel.setblocking(0)
+        line_buffers = (bytearray(), bytearray())
+        captured = (bytearray(), bytearray()) if capture_output else None
 
-        while not stdout.channel.exit_status_ready():
-            # Calculate remaining timeout
-            if timeout:
-                elapsed = time.time() - start_time
-                remaining_timeout = timeout - elapsed
-                if remaining_timeout <= 0:
-                    stdout.channel.close()
-                    raise CommandTimeoutError(command, timeout)
-                select_timeout = min(1.0, remaining_timeout)  # Check every second max
-            else:
-                select_timeout = 1.0
+        # Registered once; the selector (epoll on Linux) keeps the interest set between waits
+        selector = selectors.DefaultSelector()
+        try:
+            selector.register(channel, selectors.EVENT_READ)
+            while True:
+                # Wait on the remaining budget; the cap keeps stderr-only output flowing
+                # since paramiko only signals the channel fd for stdout data
+                select_timeout = self.SELECT_POLL_INTERVAL
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        channel.close()
+                        raise CommandTimeoutError(command, timeout)
+                    select_timeout = min(select_timeout, remaining)
+
+                try:
+                    selector.select(select_timeout)
+                except OSError:
+                    # Handle select errors (like on Windows)
+                    break
+
+                # Only ask for the exit status once a wakeup brings no new output
+                if self._drain_channel(channel, line_buffers, output_callback, captured):
+                    continue
+                if channel.exit_status_ready():
+                    break
+        finally:
+            selector.close()
+
+        # Pick up output that arrived together with the exit status
+        self._drain_channel(channel, line_buffers, output_callback, captured)
+        if output_callback:
+            stdout_tail, stderr_tail = line_buffers
+            if stdout_tail:
+                output_callback(stdout_tail.decode(errors='replace').strip())
+            if stderr_tail:
+                output_callback(f"STDERR: {stderr_tail.decode(errors='replace').strip()}")
+
+        exit_code = channel.recv_exit_status()
+        if capture_output:
+            return exit_code, captured[0].decode(errors='replace'), captured[1].decode(errors='replace')
+        return exit_code
+
+    def _drain_channel(self, channel, line_buffers, output_callback, captured):
+        """Read everything buffered on the channel, passing complete lines to output_callback.
+        Returns True if any output was read."""
+        received = False
+        streams = (
+            (channel.recv_ready, channel.recv, ''),
+            (channel.recv_stderr_ready, channel.recv_stderr, 'STDERR: '),
+        )
+        for index, (ready, recv, prefix) in enumerate(streams):
+            while ready():
+                data = recv(self.RECV_CHUNK_SIZE)
+                received = True
+                if captured is not None:
+                    captured[index].extend(data)
+                if output_callback:
+                    line_buffers[index].extend(data)
+            if output_callback:
+                _emit_lines(line_buffers[index], output_callback, prefix)
+        return received
 
-            try:
-                ready, _, _ = select.select([stdout.channel, stderr.channel], [], [], select_timeout)
-
-                if stdout.channel in ready:
-                    try:
-                        line = stdout.readline()
-                        if line and output_callback:
-                            output_callback(line.strip())
-                    except:
-                        pass  # Channel might be closed
-
-                if stderr.channel in ready:
-                    try:
-                        line = stderr.readline()
-                        if line and output_callback:
-                            output_callback(f"STDERR: {line.strip()}")
-                    except:
-                        pass
-
-            except select.error:
-                # Handle select errors (like on Windows)
-                break
+    def execute_shell(self, command, timeout=None, capture_output=False):
+        """Run a command on a long-lived shell channel, skipping the channel open execute() pays per call.
 
-        # Get any remaining output (with timeout protection)
+        Commands share the shell, so `cd` and exported variables carry over between calls.
+        Returns the exit code, or (exit_code, output, '') when capture_output is set; the shell
+        merges stderr into output. Falls back to execute() when the shell channel can't be opened.
+        """
+        if not self.client:
+            raise VMConnectionError("Not connected to VM")
+        shell = self._open_shell()
+        if shell is None:
+            if capture_output:
+                return self.execute(command, timeout=timeout, capture_output=True)
+            return self.execute(command, timeout=timeout)
+
+        marker = HealthCheckConfig.BATCH_RC_MARKER
+        shell.sendall(f"{command}\nprintf '\\n{marker}%d\\n' $?\n".encode())
+
+        deadline = time.monotonic() + timeout if timeout else None
+        if deadline is None:
+            # Block for as long as it takes; a timed call before may have left its timeout on the shared channel
+            shell.settimeout(None)
+        buffer = bytearray()
+        while True:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # The shell is still busy with the command, so it can't be reused
+                    self._shell = None
+                    shell.close()
+                    raise CommandTimeoutError(command, timeout)
+                shell.settimeout(remaining)
+            try:
+                data = shell.recv(self.RECV_CHUNK_SIZE)
+            except socket.timeout:
+                continue
+            if not data:
+                self._shell = None
+                raise VMConnectionError(f"Shell channel closed while running '{command}'")
+            # Only the tail of what was already read can still hold a partial marker
+            search_from = max(len(buffer) - len(marker) - 8, 0)
+            buffer.extend(data)
+            match = _SHELL_RC_RE.search(buffer, search_from)
+            if match:
+                exit_code = int(match.group(1))
+                if capture_output:
+                    return exit_code, buffer[:match.start()].decode(errors='replace'), ''
+                return exit_code
+            if not capture_output:
+                del buffer[:search_from]
+
+    def _open_shell(self):
+        """Return the long-lived shell channel, opening it on first use or after it died"""
+        if self._shell is not None and not self._shell.closed and not self._shell.exit_status_ready():
+            return self._shell
+        self._shell = None
         try:
-            for line in stdout.readlines():
-                if output_callback:
-                    output_callback(line.strip())
-        except (socket.timeout, paramiko.buffered_pipe.PipeTimeout):
-            pass  # Channel timed out, ignore remaining output
+            shell = self.client.get_transport().open_session()
+            shell.set_combine_stderr(True)
+            # A plain sh reading stdin: unlike invoke_shell() there is no pty, prompt or echo to parse
+            shell.exec_command('/bin/sh')
+        except (_paramiko().SSHException, OSError) as e:
+            logger.warning("Could not open a shell channel, falling back to exec_command: %s", e)
+            return None
+        self._shell = shell
+        return shell
+
+    def batch_execute(self, commands, timeout=None):
+        """Run several commands concurrently, each on its own channel over the one SSH transport.
+
+        Output is discarded. Returns the exit codes in the same order as commands.
+        """
+        if not self.client:
+            raise VMConnectionError("Not connected to VM")
+        # Like execute(), replace a transport that dropped since the last command
+        self.ensure_connected()
 
+        deadline = time.monotonic() + timeout if timeout else None
+        transport = self.client.get_transport()
+        channels = []
+        selector = selectors.DefaultSelector()
         try:
-            for line in stderr.readlines():
-                if output_callback:
-                    output_callback(f"STDERR: {line.strip()}")
-        except (socket.timeout, paramiko.buffered_pipe.PipeTimeout):
-            pass  # Channel timed out, ignore remaining output
+            for command in commands:
+                channel = transport.open_session()
+                channels.append((command, channel))
+                channel.exec_command(command)
+                channel.setblocking(0)
+                selector.register(channel, selectors.EVENT_READ)
+
+            pending = list(channels)
+            while pending:
+                select_timeout = self.SELECT_POLL_INTERVAL
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        for _, channel in pending:
+                            channel.close()
+                        raise CommandTimeoutError(pending[0][0], timeout)
+                    select_timeout = min(select_timeout, remaining)
+
+                try:
+                    selector.select(select_timeout)
+                except OSError:
+                    break
+
+                still_running = []
+                for command, channel in pending:
+                    self._drain_channel(channel, None, None, None)
+                    if channel.exit_status_ready():
+                        selector.unregister(channel)
+                    else:
+                        still_running.append((command, channel))
+                pending = still_running
+        except (_paramiko().SSHException, OSError):
+            # Don't leave the channels opened so far running on the shared transport
+            for _, channel in channels:
+                channel.close()
+            raise
+        finally:
+            selector.close()
 
-        return stdout.channel.recv_exit_status()
+        return [channel.recv_exit_status() for _, channel in channels]
 
-    def reconnect(self, retries=3, delay=3):
+    def reconnect(self, retries=3, delay=3, max_wait=60, backoff=2.0, max_delay=30):
+        """Reconnect with exponential backoff between attempts (delay, delay*backoff, ...,
+        capped at max_delay), each pause jittered by +/-50% so clients that lost the same VM
+        don't retry in lockstep. Gives up early once max_wait seconds have been spent."""
         if retries <= 0:
             return False
-            
+
+        deadline = time.monotonic() + max_wait
         for attempt in range(1, retries + 1):
             try:
-                self.close()  # ensure old connection is gone
+                self.close(drop_pool=True)  # ensure old connection is gone
                 self.connect()
                 return True  # success
-            except (VMConnectionError, AuthenticationError, paramiko.SSHException, OSError):
-                if attempt < retries:
-                    time.sleep(delay)
-                else:
-                    return False
+            except (VMConnectionError, AuthenticationError, _paramiko().SSHException, OSError):
+                if attempt == retries:
+                    break
+                pause = min(delay * backoff ** (attempt - 1), max_delay) * random.uniform(0.5, 1.5)
+                pause = min(pause, deadline - time.monotonic())
+                if pause <= 0:
+                    break
+                time.sleep(pause)
+        return False
 
     def is_alive(self, level='medium'):
         """Check if VM is alive and responsive using multiple detection methods.
@@ -461,7 +1035,20 @@ class SSHConnection:
         Returns:
             bool: True if VM is considered alive, False otherwise
         """
-        logger.info(f"Starting VM health check (level: {level}) for {self.host}")
+        # Back-to-back pollers share one verdict for is_alive_ttl seconds
+        if self.is_alive_ttl > 0:
+            cached = self._is_alive_cache.get(level)
+            if cached is not None and time.monotonic() - cached[0] < self.is_alive_ttl:
+                return cached[1]
+
+        alive = self._run_health_checks(level)
+        if self.is_alive_ttl > 0:
+            self._is_alive_cache[level] = (time.monotonic(), alive)
+        return alive
+
+    def _run_health_checks(self, level):
+        """Run the is_alive() check cascade without consulting the cache"""
+        logger.info("Starting VM health check (level: %s) for %s", level, self.host)
 
         result = {
             'checks_passed': 0,
@@ -471,10 +1058,14 @@ class SSHConnection:
 
         # Level 1: Network-level OS detection (works even if SSH is down)
         os_detection = detect_os_activity(self.host, self.port, result)
-        logger.info(f"OS detection result: {os_detection}")
+        logger.info("OS detection result: %s", os_detection)
 
         # Level 2: SSH connectivity check
-        if level in ['medium', 'thorough']:
+        if level in ['medium', 'thorough'] and result['checks_passed'] == 0:
+            # Nothing answered on the network, the SSH port included, so skip the connect timeout
+            result['failed_checks'].append(HealthCheckConfig.SSH_SKIPPED_MESSAGE)
+            result['checks_failed'] += 1
+        elif level in ['medium', 'thorough']:
             ssh_ok = check_ssh_connectivity(self, result)
             if ssh_ok and level == 'thorough':
                 # Level 3: System services check
@@ -487,11 +1078,12 @@ class SSHConnection:
             return False
 
         success_rate = result['checks_passed'] / total_checks
-        is_alive = success_rate >= 0.6 or os_detection['os_active']
+        is_alive = success_rate >= HealthCheckConfig.ALIVE_CONFIDENCE_THRESHOLD or os_detection['os_active']
 
-        logger.info(f"VM health check complete: {result['checks_passed']}/{total_checks} passed, alive={is_alive}")
+        logger.info("VM health check complete: %d/%d passed, alive=%s",
+                    result['checks_passed'], total_checks, is_alive)
         if result['failed_checks']:
-            logger.warning(f"Failed checks: {result['failed_checks']}")
+            logger.warning("Failed checks: %s", result['failed_checks'])
 
         return is_alive
 
@@ -501,9 +1093,9 @@ class SSHConnection:
             raise VMConnectionError("Not connected to VM")
         try:
             self.last_boot_id = self._get_boot_id()
-            logger.info(f"Boot ID recorded: {self.last_boot_id[:8]}...")
+            logger.info("Boot ID recorded: %.8s...", self.last_boot_id)
         except Exception as e:
-            logger.error(f"Failed to record boot ID: {e}")
+            logger.error("Failed to record boot ID: %s", e)
             raise
 
     def check_reboot(self):
@@ -514,26 +1106,89 @@ class SSHConnection:
             raise ValueError("Boot ID not recorded yet")
 
         try:
-            current_boot_id = self._get_boot_id()
+            current_boot_id = self._recent_boot_id() or self._get_boot_id()
             if current_boot_id != self.last_boot_id:
-                logger.warning(f"VM reboot detected! Old: {self.last_boot_id[:8]}..., New: {current_boot_id[:8]}...")
+                logger.warning("VM reboot detected! Old: %.8s..., New: %.8s...", self.last_boot_id, current_boot_id)
                 raise VMRebootDetectedError("VM reboot detected")
             logger.debug("No reboot detected")
         except Exception as e:
             if "VM reboot detected" in str(e):
                 raise
-            logger.error(f"Failed to check reboot status: {e}")
+            logger.error("Failed to check reboot status: %s", e)
             raise
 
-    def _get_boot_id(self):
-        """Get the current boot ID from the VM"""
-        _, stdout, stderr = self.client.exec_command("cat /proc/sys/kernel/random/boot_id")
-        boot_id = stdout.read().decode().strip()
-        if not boot_id:
-            error = stderr.read().decode().strip()
-            raise VMConnectionError(f"Failed to get boot ID: {error}")
+    def fetch_host_state(self, result, level='medium'):
+        """Read the boot ID and run the system service checks in a single round trip.
+
+        Service checks are tallied into result. The boot ID is recorded if none was yet,
+        and otherwise kept for check_reboot() to compare against for BOOT_ID_MAX_AGE seconds.
+        Returns the boot ID, or None if it couldn't be read. If the batched command itself fails
+        (e.g. it times out), every service check is tallied as failed with the error.
+        """
+        services_to_check = _system_service_checks(level)
+        commands = [self.BOOT_ID_COMMAND] + [command for command, _ in services_to_check]
+        try:
+            _, stdout, _ = self.execute(_batch_commands(commands),
+                                        timeout=HealthCheckConfig.SERVICE_CHECK_TIMEOUT * len(commands),
+                                        capture_output=True)
+        except VMConnectionError as e:
+            for _, description in services_to_check:
+                result['failed_checks'].append(f'{description} error: {str(e)}')
+                result['checks_failed'] += 1
+            return None
+        sections = _split_batched_output(stdout, len(commands))
+
+        exit_code, output = sections[0]
+        match = _BOOT_ID_TEXT_RE.search(output) if exit_code == 0 else None
+        boot_id = match.group() if match else None
+        if boot_id is not None:
+            self._observed_boot_id = (boot_id, time.monotonic())
+            if self.last_boot_id is None:
+                self.last_boot_id = boot_id
+
+        _tally_service_checks(result, services_to_check, sections[1:])
         return boot_id
 
+    def _recent_boot_id(self):
+        """Boot ID fetched by fetch_host_state() within BOOT_ID_MAX_AGE seconds, else None"""
+        if self._observed_boot_id is None:
+            return None
+        boot_id, observed_at = self._observed_boot_id
+        if time.monotonic() - observed_at > self.BOOT_ID_MAX_AGE:
+            return None
+        return boot_id
+
+    def _get_boot_id(self):
+        """Get the current boot ID from the VM, over the long-lived shell when one can be opened"""
+        if self._open_shell() is None:
+            return self._exec_boot_id()
+        exit_code, output, _ = self.execute_shell(self.BOOT_ID_COMMAND, timeout=self.connection_timeout,
+                                                  capture_output=True)
+        match = _BOOT_ID_TEXT_RE.search(output) if exit_code == 0 else None
+        if match is None:
+            raise VMConnectionError(f"Failed to get boot ID: {output.strip()}")
+        return match.group()
+
+    def _exec_boot_id(self):
+        """Get the current boot ID on a channel of its own"""
+        _, stdout, stderr = self.client.exec_command(self.BOOT_ID_COMMAND)
+        channel = stdout.channel
+        # Stop as soon as the UUID is in hand instead of waiting for EOF and channel close
+        buffer = bytearray()
+        while True:
+            match = _BOOT_ID_RE.search(buffer)
+            if match:
+                channel.close()
+                return match.group().decode()
+            if len(buffer) > self.BOOT_ID_READ_SIZE:
+                break
+            data = channel.recv(self.BOOT_ID_READ_SIZE)
+            if not data:
+                break
+            buffer.extend(data)
+        error = stderr.read().decode(errors='replace').strip()
+        channel.close()
+        raise VMConnectionError(f"Failed to get boot ID: {error}")
 
 
 # SSHConnection: Low-level SSH operations
@@ -547,7 +1202,10 @@ class VMConnection:
     High-level wrapper for managing a VM connection and health checks.
     Delegates SSH handling to SSHConnection.
     """
+    __slots__ = ('ssh',)
+
     def __init__(self, host, user, key_path, port=22, connection_timeout=10):
+        # Each wrapper owns its connection; wrappers for the same VM still share the pooled transport
         self.ssh = SSHConnection(host, user, key_path, port, connection_timeout)
 
     def connect(self):
@@ -558,56 +1216,149 @@ class VMConnection:
         """Close SSH connection."""
         self.ssh.close()
 
-    def execute(self, command, timeout=None, output_callback=None):
+    def execute(self, command, timeout=None, output_callback=None, capture_output=False):
         """Execute a command over SSH."""
-        return self.ssh.execute(command, timeout=timeout, output_callback=output_callback)
+        return self.ssh.execute(command, timeout=timeout, output_callback=output_callback,
+                                capture_output=capture_output)
+
+    def batch_execute(self, commands, timeout=None):
+        """Execute several commands concurrently over SSH."""
+        return self.ssh.batch_execute(commands, timeout=timeout)
 
     def is_alive(self, level='medium'):
-        result = {
-            'alive': False,
-            'confidence': 0.0,
-            'checks_passed': 0,
-            'checks_failed': 0,
-            'response_time_ms': 0,
-            'failed_checks': [],
-            'ssh_available': False,
-            'network_reachable': False,
-            'os_signs_detected': False,
-            'detailed_status': {}
-        }
+        # Each level runs its own straight-line pipeline; unknown levels get the network-only one
+        return self._LEVEL_DISPATCH.get(level, VMConnection._is_alive_basic)(self)
+
+    def _is_alive_basic(self):
+        """Network-level checks only."""
+        result = _new_alive_result()
+        self._probe_network(result)
+        return _decide_alive(result)
+
+    def _is_alive_medium(self):
+        """Network-level and SSH checks."""
+        result = _new_alive_result()
+        self._check_ssh(result)
+        return _decide_alive(result)
+
+    def _is_alive_thorough(self):
+        """Network-level and SSH checks, then system services and advanced OS detection."""
+        result = _new_alive_result()
+        ssh_ok = self._check_ssh(result)
+        if ssh_ok:
+            # Both only wait on the VM, so overlap them on the shared transport
+            partials = [_new_check_result(), _new_check_result()]
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                services = executor.submit(check_system_services, self.ssh, partials[0], level='thorough')
+                advanced = executor.submit(advanced_os_detection, self.ssh, partials[1])
+            services.result()
+            advanced.result()
+            _fold_results(result, partials)
+        elif ssh_ok is not None:
+            result['failed_checks'].extend([
+            'System services check skipped - SSH unavailable',
+            'Advanced OS detection skipped - SSH unavailable'])
+            result['checks_failed'] += 2
+        return _decide_alive(result)
+
+    _LEVEL_DISPATCH = {
+        'basic': _is_alive_basic,
+        'medium': _is_alive_medium,
+        'thorough': _is_alive_thorough,
+    }
 
-        # 1. Always do network-level checks
+    def _probe_network(self, result):
+        """Run the network-level checks into result."""
         detection_result = detect_os_activity(self.ssh.host, self.ssh.port, result)
         result.update(detection_result)
         result['network_reachable'] = detection_result['network_responsive']
         result['os_signs_detected'] = detection_result['os_active']
 
-        # 2. SSH checks for medium and thorough levels (regardless of network status)
-        if level in ['medium', 'thorough']:
+    def _check_ssh(self, result):
+        """
+        Check SSH into result, running the network-level checks too unless SSH already proved the VM is up.
+        Returns whether SSH works, or None when it was skipped because nothing answered on the network.
+        """
+        # With a live session, a working SSH command is stronger evidence than any
+        # network probe, so try it first; the probes then only run to explain a failure
+        ssh_ok = None
+        if self.ssh.is_connected():
             ssh_ok = check_ssh_connectivity(self.ssh, result)
-            result['ssh_available'] = ssh_ok
-            
-            # 3. System services only for thorough level
-            if level == 'thorough':
-                if ssh_ok:
-                    check_system_services(self.ssh, result, level='thorough')
-                    advanced_os_detection(self.ssh, result)
-                else:
-                    result['failed_checks'].extend([
-                    'System services check skipped - SSH unavailable',
-                    'Advanced OS detection skipped - SSH unavailable'])
-                    result['checks_failed'] += 2
-
-        # 4. Decision logic
-        total_checks = result['checks_passed'] + result['checks_failed']
-        if total_checks > 0:
-            result['confidence'] = result['checks_passed'] / total_checks
-            if result['os_signs_detected'] and result['confidence'] > 0.6:
-                result['alive'] = True
-            elif result['ssh_available'] and result['confidence'] > 0.7:
-                result['alive'] = True
 
-        return result
+        if ssh_ok:
+            result.update(_SSH_CONFIRMED_DETECTION)
+            result['network_reachable'] = True
+            result['os_signs_detected'] = True
+        else:
+            self._probe_network(result)
+
+        # Unless nothing at all answered on the network: the port probes include
+        # the SSH port, so SSH would only time out
+        if ssh_ok is None and result['checks_passed'] == 0:
+            result['failed_checks'].append(HealthCheckConfig.SSH_SKIPPED_MESSAGE)
+            result['checks_failed'] += 1
+            return None
+        if ssh_ok is None:
+            ssh_ok = check_ssh_connectivity(self.ssh, result)
+        result['ssh_available'] = ssh_ok
+        return ssh_ok
+
+
+# detect_os_activity() keys for a VM that SSH already proved up, so the probes never ran
+_SSH_CONFIRMED_DETECTION = {
+    'network_responsive': True,
+    'os_active': True,
+    'ping_responsive': False,
+    'port_behavior': 'skipped',
+    'tcp_stack_active': False,
+    'response_pattern': 'ssh',
+}
+
+
+def _new_alive_result():
+    """Fresh result dict for VMConnection.is_alive()."""
+    return {
+        'alive': False,
+        'confidence': 0.0,
+        'checks_passed': 0,
+        'checks_failed': 0,
+        'response_time_ms': 0,
+        'failed_checks': [],
+        'ssh_available': False,
+        'network_reachable': False,
+        'os_signs_detected': False,
+        'detailed_status': {}
+    }
+
+
+def _decide_alive(result):
+    """Fill in confidence and the alive verdict from the tallied checks, returning result."""
+    total_checks = result['checks_passed'] + result['checks_failed']
+    if total_checks > 0:
+        confidence = result['checks_passed'] / total_checks
+        result['confidence'] = confidence
+        result['alive'] = any(result[evidence] and confidence > threshold
+                              for evidence, threshold in HealthCheckConfig.ALIVE_EVIDENCE)
+    return result
+
+class VMFleet:
+    """
+    Health checks for many VMs at once. Each VM gets its own worker thread,
+    so a fleet check takes as long as the slowest VM rather than the sum of all.
+    """
+    __slots__ = ('vms',)
+
+    MAX_WORKERS = 32
+
+    def __init__(self, vms):
+        self.vms = list(vms)
+
+    def is_alive_all(self, level='medium'):
+        """Run VMConnection.is_alive() on every VM concurrently; results come back in VM order."""
+        if not self.vms:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(self.vms), self.MAX_WORKERS)) as executor:
+            return list(executor.map(lambda vm: vm.is_alive(level=level), self.vms))
 
 # ============================================================================
 # EXPORTS
@@ -616,6 +1367,7 @@ class VMConnection:
 __all__ = [
     'SSHConnection',
     'VMConnection', 
+    'VMFleet',
     'VMConnectionError',
     'CommandTimeoutError',
     'VMRebootDetectedError',